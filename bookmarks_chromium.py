@@ -12,15 +12,19 @@ Current features
 * Locate a “Bookmarks” file for:
   - default user-data-dir &/or profile
   - an explicitly given --user-data-dir or --bookmarks-file path
+* List all profiles (`profiles`): "PATH<TAB>folders<TAB>bookmarks" for every
+  <user-data-dir>/<profile>/Bookmarks; profiles are indexed in parallel
+  worker processes (`scan_all_profiles()` for library use).
 * List bookmark *directories* (folders)
   - Output formats:
       • path  (unix-style “/” hierarchy, similar to `find`)
       • path+id  (folder path with “ (id:42)” suffix)
-      • csv   (id,parent_id,name)
-      • jsonl (one JSON object per line)
+      • csv   (id,parent_id,name as written by the `csv` module: fields
+              quoted only when needed; `--csv-header` adds a header row)
+      • jsonl (one compact JSON object per line)
   - Optional: include folders *and* bookmarks below each folder
   - Ability to start listing at a selected subtree (by id or name fragment)
-* List *contents* of a concrete folder
+* List *contents* of a concrete folder (or of several, one after another)
   - Filter: only folders / only bookmarks / mixed
   - Output formats:
       • urls            (one per line)
@@ -28,7 +32,22 @@ Current features
       • jsonl           (raw nodes)
       • markdown        (“* [title](url)”)
 * Folder *selector*: accepts numeric id or (partial) name.  Ambiguity triggers
-  a fatal “ERROR: … ambiguous …” message.
+  a fatal “ERROR: … ambiguous …” message.  `name:EXACT` matches the whole
+  folder name (case-sensitive) instead of a fragment.  `compile_selector()`
+  turns a selector into a node predicate for library callers filtering many
+  nodes (kind dispatch happens once, not per node).
+* Print a single node by id as one JSON line (`get ID`).  Bookmarks are
+  found by a raw byte scan that parses only the node itself; folders (and
+  anything the scan cannot vouch for) fall back to the full index.
+* Find *duplicate* bookmarks (same URL stored more than once)
+  - Output formats: path (URL, then one TAB-indented folder line per copy)
+    or jsonl (`{"url", "ids", "folders"}` per duplicated URL)
+* Library use: `load_index(path)` returns a `TreeIndex` built by a single DFS
+  (id → node / parent id / path, lower-cased name → ids, folder & url id
+  lists).  It is cached per file (path, mtime, size) in-process and pickled
+  to $XDG_CACHE_HOME/bookmarks_chromium/ (default ~/.cache), so repeated
+  runs on an unchanged file skip parsing and walking; `--no-cache` bypasses
+  the on-disk cache.
 
 Verbosity & logging
 * -v / --verbose flag is cumulative.  
@@ -38,11 +57,28 @@ Verbosity & logging
 * All log lines go to *stderr* and are prefixed with “INFO: ”, “DEBUG: ”, etc.
 
 Future road-map (☞ not yet implemented)
-* Moving / merging folders, duplicate search, add / edit / delete bookmarks,
+* Moving / merging folders, add / edit / delete bookmarks,
   sync between browsers, import/export, sqlite3 meta-store …
 
-Standard library only ‑ except that the external `jq` binary *may* be used
-but only for future advanced features; today everything is Python.
+Standard library only ‑ except that the external `jq` binary *may* be used.
+* `--engine jq` (or `auto` when jq is on $PATH) answers `ls <numeric id>`
+  with a single `jq -r` run that streams straight to stdout, skipping the
+  Python parse entirely.  Name-fragment selectors, and ids jq cannot find,
+  fall back to the Python engine (the default) so errors stay identical.
+* Whichever of `jaq` (faster Rust re-implementation) or `jq` is found first
+  on $PATH is used; the filters stick to the subset both understand.
+Optional speed-ups (used automatically when importable, never required):
+* `orjson` – faster parsing of the Bookmarks file and encoding of JSON output
+  (falls back to `json`, configured to emit the same compact layout);
+  files over 1 MiB are mmap-ed and parsed in place, no `bytes` copy.
+  `save_bookmarks()` (for the upcoming edit commands) also serialises with
+  it, re-indented to the exact layout the stdlib fallback (and Chromium)
+  writes, and replaces the file atomically.
+* `ijson`  – `lsd` without `--with-bookmarks` streams the file and keeps only
+  folder skeletons (id/name/children) in memory instead of the whole tree;
+  `ls --streaming` keeps only the children of the folders on the path being
+  read (and stops early for an id selector); used automatically, when
+  orjson is missing, for files of 25 MiB and more that have no cached index.
 
 The module is import-safe: no work is executed on import aside from constant
 definitions.  `main()` must be called for CLI use.
@@ -52,11 +88,35 @@ Author: 2025-04
 from __future__ import annotations
 
 import argparse
+import bisect
+import csv
+import functools
+import gc
+import hashlib
 import json
+import mmap
 import os
+import pickle
+import re
 import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+# shutil, subprocess and concurrent.futures (together ~1/3 of the import
+# time) are imported where used: most runs need none of them, and the CLI
+# is meant to be called in loops.
+
+try:  # optional, much faster JSON parser (C/SIMD); stdlib json is the fallback
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on environment
+    _orjson = None
+
+try:  # optional streaming parser; picks its fastest (yajl2_c) backend itself
+    import ijson as _ijson
+except ImportError:  # pragma: no cover - depends on environment
+    _ijson = None
 
 # ---------------------------------------------------------------------------#
 # Logging helpers                                                            #
@@ -94,74 +154,796 @@ _LINUX_DEFAULT_DIRS = [
     Path("~/.config/google-chrome").expanduser(),
     Path("~/.config/brave-browser").expanduser(),
 ]
+_LINUX_DEFAULT_DIR_STRS = [str(d) for d in _LINUX_DEFAULT_DIRS]  # for detection
+
+
+# path str -> (monotonic time of the check, is a file); library callers that
+# poll profiles get at most one stat per candidate per _ISFILE_TTL seconds.
+_ISFILE_CACHE: Dict[str, Tuple[float, bool]] = {}
+_ISFILE_TTL = 1.0
+
+
+def _is_file_cached(path_str: str) -> bool:
+    now = time.monotonic()
+    hit = _ISFILE_CACHE.get(path_str)
+    if hit is not None and now - hit[0] < _ISFILE_TTL:
+        return hit[1]
+    is_file = os.path.isfile(path_str)
+    _ISFILE_CACHE[path_str] = (now, is_file)
+    return is_file
+
+
+def _clear_detection_cache() -> None:
+    """Forget cached is-file checks (e.g. right after creating a profile)."""
+    _ISFILE_CACHE.clear()
 
 
 def _detect_bookmarks_file(
     user_data_dir: Optional[Path], profile: str
 ) -> Optional[Path]:
     """Return the Bookmarks file Path or None if not found."""
-    candidates: List[Path] = []
+    # plain os.path strings; only a hit is turned into a Path
     if user_data_dir is not None:
-        candidates.append(user_data_dir.expanduser() / profile / "Bookmarks")
+        bases = [os.path.expanduser(user_data_dir)]
     else:
-        for base in _LINUX_DEFAULT_DIRS:
-            candidates.append(base / profile / "Bookmarks")
-
-    for path in candidates:
-        if path.is_file():
-            log_debug(f"Found Bookmarks file at {path}")
-            return path
+        bases = _LINUX_DEFAULT_DIR_STRS
+    for base in bases:
+        candidate = os.path.join(base, profile, "Bookmarks")
+        if _is_file_cached(candidate):
+            log_debug(f"Found Bookmarks file at {candidate}")
+            return Path(candidate)
     return None
 
 
+def discover_bookmarks_files(base_dirs: Optional[Sequence[Path]] = None) -> List[Path]:
+    """Return every <user-data-dir>/<profile>/Bookmarks below *base_dirs*.
+
+    Defaults to the known Linux user-data-dirs; profiles are sorted by name.
+    """
+    found: List[Path] = []
+    for base in base_dirs or _LINUX_DEFAULT_DIRS:
+        try:
+            profile_dirs = sorted(base.expanduser().iterdir())
+        except OSError:
+            continue
+        for profile_dir in profile_dirs:
+            bm_path = profile_dir / "Bookmarks"
+            if bm_path.is_file():
+                found.append(bm_path)
+    log_debug(f"Discovered Bookmarks files: {found}")
+    return found
+
+
 # ---------------------------------------------------------------------------#
 # JSON helpers                                                               #
 # ---------------------------------------------------------------------------#
 Node = Dict[str, Any]
 
+# Both accept raw UTF-8 bytes, which saves a decode-to-str pass.
+_json_loads = _orjson.loads if _orjson is not None else json.loads
+
+# Above this size (and with orjson, which accepts any buffer) parse straight
+# from an mmap of the file instead of reading it into a bytes object first.
+_MMAP_THRESHOLD = 1 << 20
+
 
 def _load_bookmarks(path: Path) -> Dict[str, Any]:
     log_info(f"Loading bookmarks from {path}")
-    with path.open(encoding="utf-8") as fh:
-        return json.load(fh)
+    # parsing allocates a dict per node, which keeps triggering cyclic-GC
+    # passes over the growing tree (> 2/3 of orjson's time on big files);
+    # the parsed JSON has no cycles, so the collector is paused meanwhile
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with path.open("rb") as fh:
+            if _orjson is not None and os.fstat(fh.fileno()).st_size > _MMAP_THRESHOLD:
+                with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        return _orjson.loads(view)
+            return _json_loads(fh.read())
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+# Chromium writes Bookmarks pretty-printed: 3-space indent, sorted keys,
+# ": " separators, non-ASCII kept as UTF-8, final newline.
+
+
+def _dump_bookmarks(data: Dict[str, Any]) -> bytes:
+    """*data* as bytes in Chromium's Bookmarks layout, with either JSON backend."""
+    if _orjson is not None:
+        buf = _orjson.dumps(
+            data, option=_orjson.OPT_INDENT_2 | _orjson.OPT_SORT_KEYS | _orjson.OPT_APPEND_NEWLINE
+        )
+        # orjson only indents by 2: widen every level to 3 (JSON strings hold
+        # no raw newlines, so leading spaces are always indentation)
+        lines = buf.split(b"\n")
+        for i, line in enumerate(lines):
+            if line[:1] == b" ":
+                text = line.lstrip(b" ")
+                width = len(line) - len(text)
+                lines[i] = b" " * (width + width // 2) + text
+        return b"\n".join(lines)
+    return (json.dumps(data, ensure_ascii=False, indent=3, sort_keys=True) + "\n").encode("utf-8")
+
+
+def save_bookmarks(data: Dict[str, Any], path: Path) -> None:
+    """Atomically replace *path* with *data* serialised as JSON.
+
+    The document is encoded to bytes in one go, written to a temp file next
+    to *path*, fsync-ed and moved over the original with os.replace(), so a
+    reader (e.g. the browser) never sees a half-written file.
+    """
+    log_info(f"Saving bookmarks to {path}")
+    buf = _dump_bookmarks(data)
+    tmp = path.with_name(f"{path.name}.tmp.{os.getpid()}")
+    try:
+        with tmp.open("wb") as fh:
+            fh.write(buf)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if path.exists():
+            import shutil
+
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+# Chromium pretty-prints with sorted keys and ": " separators, so in a
+# bookmark node only date_*/guid (never containing brackets) precede "id".
+_ID_NEEDLE = '"id": "{}"'
+_BRACE_TOKEN = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}]')
+
+
+def _match_brace(data: bytes, start: int) -> int:
+    """Return the offset of the "}" closing the "{" at *start*, or -1."""
+    depth = 0
+    for m in _BRACE_TOKEN.finditer(data, start):
+        tok = m.group()
+        if tok == b"{":
+            depth += 1
+        elif tok == b"}":
+            depth -= 1
+            if depth == 0:
+                return m.start()
+    return -1
+
+
+def fast_find_by_id(path: Path, node_id: str) -> Optional[Node]:
+    """Find node *node_id* by scanning the raw file, parsing only that node.
+
+    `bytes.find` runs at memory speed; only the node's own "{…}" span goes
+    through the JSON parser.  Returns None whenever that shortcut does not
+    apply (not found, or a folder, whose "id" follows its children) – the
+    caller then falls back to the full index.
+    """
+    with path.open("rb") as fh:
+        data = fh.read()
+    pos = data.find(_ID_NEEDLE.format(node_id).encode())
+    if pos == -1:
+        return None
+    start = data.rfind(b"{", 0, pos)
+    if start == -1 or b"}" in data[start:pos] or b"]" in data[start:pos]:
+        return None  # nearest "{" is not this node's own
+    end = _match_brace(data, start)
+    if end == -1:
+        return None
+    try:
+        node = _json_loads(data[start:end + 1])
+    except ValueError:
+        return None
+    return node if isinstance(node, dict) and node.get("id") == node_id else None
+
+
+_SKELETON_KEYS = ("id", "name", "type")
+
+
+def _stream_folder_roots(path: Path) -> Dict[str, Any]:
+    """Stream *path* with ijson and return `roots` holding folders only.
+
+    Each folder is reduced to ``{"id", "name", "type", "children"}`` where
+    ``children`` lists sub-folders only; bookmark nodes, meta-info and other
+    keys are never materialised.  Memory is proportional to the number of
+    folders rather than to the size of the file.
+    """
+    log_info(f"Streaming bookmark folders from {path}")
+    roots: Dict[str, Any] = {}
+    stack: List[Tuple[str, Node]] = []  # (ijson prefix, node) of open nodes
+    with path.open("rb") as fh:
+        for prefix, event, value in _ijson.parse(fh):
+            if event == "start_map":
+                if prefix.endswith(".children.item") or (
+                    prefix.startswith("roots.") and prefix.count(".") == 1
+                ):
+                    stack.append((prefix, {"children": []}))
+            elif event == "end_map":
+                if not stack or stack[-1][0] != prefix:
+                    continue
+                _, node = stack.pop()
+                if stack:
+                    if node.get("type") == "folder":
+                        stack[-1][1]["children"].append(node)
+                else:
+                    roots[prefix[len("roots."):]] = node
+            elif event == "string" and stack:
+                top_prefix, node = stack[-1]
+                key = prefix[len(top_prefix) + 1:]
+                if key in _SKELETON_KEYS:
+                    node[key] = value
+    return roots
+
+
+# ---------------------------------------------------------------------------#
+# jq helpers                                                                 #
+# ---------------------------------------------------------------------------#
+# Locate folder `$id` anywhere below .roots; jq exits non-zero when absent.
+_JQ_FIND_FOLDER = (
+    'first(.roots[] | .. | objects | select(.type? == "folder" and .id? == $id))'
+    ' // error("no folder with id \\($id)")'
+)
+
+_JQ_CONTENTS_TYPE = {
+    "all": "",
+    "folders": ' | select(.type == "folder")',
+    "bookmarks": ' | select(.type == "url")',
+}
+
+_JQ_CONTENTS_FORMAT = {
+    "urls": 'if .type == "folder" then "/\\(.name)" else .url end',
+    "urls_titles": 'if .type == "folder" then "/\\(.name)\\t\\(.name)"'
+    ' else "\\(.url)\\t\\(.name)" end',
+    "markdown": 'if .type == "folder" then "* **\\(.name)**"'
+    ' else "* [\\(.name)](\\(.url))" end',
+    "jsonl": ".",
+}
+
+
+# Preference order: jaq accepts the same filters/flags we use and is faster.
+_JQ_BINS = ("jaq", "jq")
+
+
+def _jq_bin() -> Optional[str]:
+    """Return the path of the preferred jq-compatible binary or None."""
+    import shutil
+
+    for name in _JQ_BINS:
+        found = shutil.which(name)
+        if found:
+            return found
+    return None
+
+
+def _jq(
+    filter_expr: str,
+    path: Path,
+    *,
+    raw: bool = True,
+    jq_args: Optional[Dict[str, str]] = None,
+) -> bool:
+    """Run jq on *path*, streaming its stdout to ours; True on success."""
+    jq = _jq_bin()
+    if jq is None:
+        return False
+    cmd = [jq, "-r" if raw else "-c"]
+    for name, value in (jq_args or {}).items():
+        cmd += ["--arg", name, value]
+    cmd += [filter_expr, str(path)]
+    log_debug(f"Running: {cmd}")
+    import subprocess
+
+    sys.stdout.flush()
+    proc = subprocess.run(cmd, stderr=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        log_debug(f"jq failed ({proc.returncode}): {proc.stderr.strip()}")
+        return False
+    return True
+
+
+def _ls_with_jq(bm_path: Path, selector: str, args: argparse.Namespace) -> bool:
+    """Answer `ls` with jq; False means the caller must use Python."""
+    if not selector.isdigit():
+        return False  # only ids are unambiguous without Python-side checks
+    expr = (
+        f"{_JQ_FIND_FOLDER} | .children[]?"
+        f"{_JQ_CONTENTS_TYPE[args.contents_type]}"
+        f" | {_JQ_CONTENTS_FORMAT[args.contents_format]}"
+    )
+    return _jq(
+        expr,
+        bm_path,
+        raw=args.contents_format != "jsonl",
+        jq_args={"id": selector},
+    )
+
+
+def _use_jq(args: argparse.Namespace) -> bool:
+    if args.engine == "jq":
+        if _jq_bin() is None:
+            log_error("--engine jq requested but neither jaq nor jq is installed.")
+            sys.exit(1)
+        return True
+    return args.engine == "auto" and _jq_bin() is not None
 
 
 # ---------------------------------------------------------------------------#
 # Traversal utils                                                            #
 # ---------------------------------------------------------------------------#
+_NO_CHILDREN: Tuple[Node, ...] = ()  # shared, instead of a new [] per miss
+
+
+def _walk(
+    root: Node, parent_id: Optional[str] = None, path_parts: Sequence[str] = ()
+) -> Iterator[Tuple[Node, Optional[str], Tuple[str, ...]]]:
+    """Yield (node, parent_id, path_parts) for folder *root* and all below it.
+
+    Pre-order, iterative: a stack of child iterators replaces recursion.
+    A folder's path tuple (ending with its own name) is built once, when the
+    folder is entered, and handed out unchanged for every bookmark inside
+    it – immutable, hashable and never copied per node.
+    """
+    if root.get("type") != "folder":
+        return
+    path = (*path_parts, root["name"])
+    yield root, parent_id, path
+    stack = [(root["id"], path, iter(root.get("children") or _NO_CHILDREN))]
+    while stack:
+        folder_id, path, children = stack[-1]
+        for child in children:
+            if child.get("type") == "folder":
+                child_path = path + (child["name"],)
+                yield child, folder_id, child_path
+                grandchildren = child.get("children") or _NO_CHILDREN
+                stack.append((child["id"], child_path, iter(grandchildren)))
+                break
+            yield child, folder_id, path
+        else:
+            stack.pop()
+
+
 def _iter_folders(
-    node: Node, parent_id: Optional[str] = None, path_parts: Optional[List[str]] = None
-):
-    """Yield tuples (folder_node, parent_id, path_parts)."""
-    path_parts = list(path_parts or [])
-    if node.get("type") == "folder":
-        yield node, parent_id, path_parts + [node["name"]]
-        for child in node.get("children", []):
-            yield from _iter_folders(child, node["id"], path_parts + [node["name"]])
+    node: Node, parent_id: Optional[str] = None, path_parts: Sequence[str] = ()
+) -> Iterator[Tuple[Node, Optional[str], Tuple[str, ...]]]:
+    """Yield tuples (folder_node, parent_id, path_parts) – parts as a tuple."""
+    for child, child_parent, parts in _walk(node, parent_id, path_parts):
+        if child.get("type") == "folder":
+            yield child, child_parent, parts
+
+
+def _find_folder_by_id(
+    roots: Dict[str, Any], wanted_id: str
+) -> Optional[Tuple[Node, Optional[str], Tuple[str, ...]]]:
+    """Return (folder, parent_id, path_parts) of folder *wanted_id*, or None.
+
+    Walks the roots in the same order as `index_tree` but stops at the first
+    match, so a known id costs only the part of the tree before it.
+    """
+    for root_name, root in roots.items():
+        if not isinstance(root, dict):
+            continue
+        for folder, parent_id, path in _iter_folders(root, None, (root_name,)):
+            if folder["id"] == wanted_id:
+                return folder, parent_id, path
+    return None
 
 
 def _iter_children(node: Node):
     """Yield direct children nodes of *folder* `node`."""
-    return node.get("children", [])
+    return node.get("children") or _NO_CHILDREN
+
+
+@dataclass(slots=True)
+class FolderNode:
+    """Compact handle of one folder inside a `TreeIndex`.
+
+    Slotted: smaller than a dict and with fixed-offset attribute access for
+    the hot loops; `raw` is the original JSON node, so edits made through it
+    land in the loaded document without a re-sync step.
+    """
+
+    id: str
+    parent_id: Optional[str]
+    name: str
+    name_lc: str
+    children: List[str]  # child ids (folders and bookmarks), in order
+    raw: Node
+    pos: int  # offset in TreeIndex.folder_ids (pre-order)
+
+
+@dataclass
+class TreeIndex:
+    """Flat look-up tables over a bookmarks tree, built by `index_tree`.
+
+    One DFS fills every table, so any number of subsequent look-ups costs
+    O(1) or O(matches) instead of another walk over the tree.  Per-folder
+    data is kept as parallel lists in pre-order (struct of arrays): scans
+    run over one list and index the others only on a hit.
+    """
+
+    nodes: Dict[str, Node] = field(default_factory=dict)  # id -> node
+    folders: Dict[str, FolderNode] = field(default_factory=dict)
+    parent_ids: Dict[str, Optional[str]] = field(default_factory=dict)
+    names_lower: Dict[str, List[str]] = field(default_factory=dict)  # -> ids
+    # parallel, DFS pre-order; FolderNode.pos is a folder's offset
+    folder_ids: List[str] = field(default_factory=list)
+    folder_parent_ids: List[Optional[str]] = field(default_factory=list)
+    folder_names_lower: List[str] = field(default_factory=list)
+    folder_paths: List[Tuple[str, ...]] = field(default_factory=list)
+    folder_nodes: List[Node] = field(default_factory=list)
+    url_ids: List[str] = field(default_factory=list)
+    _path_strs: Dict[str, str] = field(default_factory=dict, repr=False)
+    _name_buf: Optional[Tuple[str, List[int]]] = field(default=None, repr=False)
+    _fragment_hits: Dict[str, List[str]] = field(default_factory=dict, repr=False)
+
+    def path_str(self, folder_id: str) -> str:
+        """Return "/root/…/name" for a folder, built once and then cached.
+
+        Built from the parent's cached string plus "/name", so siblings
+        share the work of their common prefix.
+        """
+        cached = self._path_strs.get(folder_id)
+        if cached is None:
+            folder = self.folders[folder_id]
+            if folder.parent_id is None:
+                cached = _folder_path(self.path_parts(folder_id))
+            else:
+                cached = self.path_str(folder.parent_id) + "/" + folder.name
+            self._path_strs[folder_id] = cached
+        return cached
+
+    def path_parts(self, folder_id: str) -> Tuple[str, ...]:
+        """Return the (root key, …, name) path tuple of a folder."""
+        return self.folder_paths[self.folders[folder_id].pos]
+
+    def find_by_id(self, node_id: str) -> Optional[Node]:
+        return self.nodes.get(node_id)
+
+    def _name_buffer(self) -> Tuple[str, List[int]]:
+        """All lower-cased folder names NUL-joined, plus each name's offset."""
+        if self._name_buf is None:
+            starts, pos = [], 0
+            for name in self.folder_names_lower:
+                starts.append(pos)
+                pos += len(name) + 1
+            self._name_buf = ("\0".join(self.folder_names_lower), starts)
+        return self._name_buf
+
+    def find_by_name_fragment(self, fragment: str) -> List[str]:
+        """Return ids of folders whose name contains *fragment* (any case).
+
+        Scans one pre-lowercased buffer with `str.find` (a C loop) instead of
+        lower-casing and testing every name in Python; hits come back in
+        tree order.  Results are memoised per fragment for repeated queries.
+        """
+        frag = fragment.lower()
+        cached = self._fragment_hits.get(frag)
+        if cached is not None:
+            return list(cached)
+        if "\0" in frag:  # cannot occur in names, would span the separators
+            return []
+        buf, starts = self._name_buffer()
+        hits: List[str] = []
+        last = len(starts) - 1
+        pos = buf.find(frag)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            hits.append(self.folder_ids[i])
+            pos = buf.find(frag, starts[i + 1]) if i < last else -1
+        self._fragment_hits[frag] = hits
+        return list(hits)
+
+    def list_folder_contents(self, folder_id: str) -> Sequence[Node]:
+        return _iter_children(self.nodes[folder_id])
+
+    def list_all_folders(
+        self, top_id: Optional[str] = None
+    ) -> Iterator[Tuple[Node, Optional[str], Tuple[str, ...]]]:
+        """Yield (folder, parent_id, path_parts) in pre-order.
+
+        With *top_id* only that subtree is listed and, like a fresh walk
+        started there, paths are relative to it and its parent_id is None.
+        """
+        nodes, parent_ids, paths = self.folder_nodes, self.folder_parent_ids, self.folder_paths
+        if top_id is None:
+            yield from zip(nodes, parent_ids, paths)
+            return
+        # Pre-order keeps a subtree contiguous: it ends at the first folder
+        # that is not deeper than its top.
+        start = self.folders[top_id].pos
+        cut = len(paths[start]) - 1
+        yield nodes[start], None, paths[start][cut:]
+        for i in range(start + 1, len(paths)):
+            path = paths[i]
+            if len(path) <= cut + 1:
+                break
+            yield nodes[i], parent_ids[i], path[cut:]
+
+
+def _node_depth(node: Node, path: Tuple[str, ...]) -> int:
+    """Depth of a node yielded by _walk with *path* (a folder's path ends
+    with its own name, a bookmark's with its folder's)."""
+    return len(path) if node.get("type") == "folder" else len(path) + 1
+
+
+def index_tree(roots: Dict[str, Any]) -> TreeIndex:
+    """Index every node below *roots* in one iterative DFS."""
+    index = TreeIndex()
+    nodes, parent_ids, folders = index.nodes, index.parent_ids, index.folders
+    intern = sys.intern
+    for root_name, root in roots.items():
+        if not isinstance(root, dict):
+            continue
+        # Depth of a skipped duplicate folder while its subtree (the nodes
+        # right after it in pre-order that lie deeper) is being skipped.
+        skip_below = None
+        for node, parent_id, path in _walk(root, None, (root_name,)):
+            if skip_below is not None:
+                if _node_depth(node, path) > skip_below:
+                    continue
+                skip_below = None
+            # Interned (and written back) so the long-lived index, its pickle
+            # and the raw nodes share one copy of each repeated string.
+            nid = node["id"] = intern(node["id"])
+            if nid in nodes:
+                log_warning(f"Duplicate bookmark node id {nid}; keeping the first")
+                # its children must not end up under the first node (which
+                # may not even be a folder): skip them too
+                skip_below = _node_depth(node, path)
+                continue
+            nodes[nid] = node
+            parent_ids[nid] = parent_id
+            if parent_id is not None:
+                folders[parent_id].children.append(nid)
+            ntype = node.get("type")
+            if ntype is not None:
+                ntype = node["type"] = intern(ntype)
+            if ntype == "folder":
+                name = node["name"] = intern(node["name"])
+                name_lc = intern(name.lower())
+                pos = len(index.folder_ids)
+                folders[nid] = FolderNode(nid, parent_id, name, name_lc, [], node, pos)
+                index.names_lower.setdefault(name_lc, []).append(nid)
+                index.folder_ids.append(nid)
+                index.folder_parent_ids.append(parent_id)
+                index.folder_names_lower.append(name_lc)
+                index.folder_paths.append(path)
+                index.folder_nodes.append(node)
+            else:
+                index.url_ids.append(nid)
+    return index
+
+
+# (resolved path, st_mtime_ns, st_size, folders_only) -> TreeIndex; lets
+# several look-ups in one process (library use) share one parse+walk.
+_INDEX_CACHE: Dict[Tuple[str, int, int, bool], TreeIndex] = {}
+_CacheKey = Tuple[str, int, int, bool]
+# Bump whenever TreeIndex/FolderNode change shape so old pickles are ignored.
+_INDEX_CACHE_VERSION = 4
+
+
+def _cache_file(key: _CacheKey) -> Path:
+    """$XDG_CACHE_HOME/bookmarks_chromium/<sha1(path, folders_only)>.pkl"""
+    base = Path(os.environ.get("XDG_CACHE_HOME") or "~/.cache").expanduser()
+    digest = hashlib.sha1(f"{key[0]}|{int(key[3])}".encode()).hexdigest()
+    return base / "bookmarks_chromium" / f"{digest}.pkl"
+
+
+def _read_cached_index(key: _CacheKey) -> Optional[TreeIndex]:
+    """Return the pickled index for *key*, or None if missing/stale/unreadable."""
+    cache_file = _cache_file(key)
+    try:
+        with cache_file.open("rb") as fh:
+            version, cached_key, index = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as e:  # corrupt or from an older version: just rebuild
+        log_debug(f"Ignoring unreadable index cache {cache_file}: {e}")
+        return None
+    if version != _INDEX_CACHE_VERSION or cached_key != key:
+        return None
+    log_debug(f"Loaded bookmarks index from cache {cache_file}")
+    return index
+
+
+def _write_cached_index(key: _CacheKey, index: TreeIndex) -> None:
+    """Atomically pickle *index*; failures only cost the next run a rebuild."""
+    cache_file = _cache_file(key)
+    tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as fh:
+            payload = (_INDEX_CACHE_VERSION, key, index)
+            pickle.dump(payload, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_file)
+    except (OSError, pickle.PicklingError, RecursionError) as e:
+        log_debug(f"Could not write index cache {cache_file}: {e}")
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+
+
+def _index_base_key(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return (str(path.resolve()), st.st_mtime_ns, st.st_size)
+
+
+def cached_index(
+    path: Path, *, folders_only: bool = False, disk_cache: bool = True
+) -> Optional[TreeIndex]:
+    """Return the already built TreeIndex for *path*, or None – never parses."""
+    base_key = _index_base_key(path)
+    keys = [(*base_key, False)] + ([(*base_key, True)] if folders_only else [])
+    for key in keys:
+        index = _INDEX_CACHE.get(key)
+        if index is None and disk_cache:
+            index = _read_cached_index(key)
+            if index is not None:
+                _INDEX_CACHE[key] = index
+        if index is not None:
+            log_debug(f"Re-using bookmarks index of {path}")
+            return index
+    return None
 
 
-def _match_selector(folders: List[Tuple[Node, str, List[str]]], selector: str) -> Node:
-    """Return the single matching folder node for selector."""
-    by_id = [f for f, *_ in folders if f["id"] == selector]
-    if by_id:
-        if len(by_id) > 1:  # Impossible by definition of id, but sanity check
-            log_error(f"Internal error: multiple folders with id {selector}")
-            sys.exit(1)
-        return by_id[0]
-
-    # match by (case-insensitive) substring of name
-    sel_low = selector.lower()
-    matches = [f for f, *_ in folders if sel_low in f["name"].lower()]
+def load_index(
+    path: Path,
+    *,
+    folders_only: bool = False,
+    disk_cache: bool = True,
+    data: Optional[Dict[str, Any]] = None,
+) -> TreeIndex:
+    """Return the TreeIndex for *path*, rebuilt only when the file changes.
+
+    *folders_only* allows the cheaper ijson skeleton (no bookmark nodes).
+    *data* is the already parsed file, if the caller has it.
+    Indexes are memoised in-process and, unless *disk_cache* is False,
+    pickled under $XDG_CACHE_HOME so the next CLI run skips parse + walk.
+    Both caches are keyed on (path, st_mtime_ns, st_size).
+    """
+    index = cached_index(path, folders_only=folders_only, disk_cache=disk_cache)
+    if index is not None:
+        return index
+    if data is not None:
+        roots = data["roots"]
+        folders_only = False
+    elif folders_only and _ijson is not None:
+        roots = _stream_folder_roots(path)
+    else:
+        roots = _load_bookmarks(path)["roots"]
+        folders_only = False
+    key = (*_index_base_key(path), folders_only)
+    index = _INDEX_CACHE[key] = index_tree(roots)
+    if disk_cache:
+        _write_cached_index(key, index)
+    return index
+
+
+def _map_profiles(func: Callable[[Path], Any], paths: Sequence[Path]) -> List[Any]:
+    """Apply *func* (a picklable top-level callable) to each path.
+
+    Profiles are independent trees, so with more than one they are handled
+    in a process pool – parsing is CPU bound and would serialise on the GIL
+    in threads.
+    """
+    if len(paths) <= 1:
+        return [func(p) for p in paths]
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(func, paths))
+
+
+def scan_all_profiles(
+    paths: Optional[Sequence[Path]] = None, *, disk_cache: bool = True
+) -> Dict[Path, TreeIndex]:
+    """Return {Bookmarks path: TreeIndex} for many profiles, indexed in parallel.
+
+    *paths* defaults to `discover_bookmarks_files()`.  Unchanged profiles
+    come straight from the on-disk index cache.
+    """
+    if paths is None:
+        paths = discover_bookmarks_files()
+    loader = functools.partial(load_index, disk_cache=disk_cache)
+    return dict(zip(paths, _map_profiles(loader, paths)))
+
+
+def _profile_summary(path: Path, disk_cache: bool = True) -> Optional[Tuple[int, int]]:
+    """(folders, bookmarks) of one Bookmarks file; None if it cannot be read.
+
+    Runs in pool workers, so only these two numbers travel back instead of
+    a pickled index.
+    """
+    try:
+        index = load_index(path, disk_cache=disk_cache)
+    except (OSError, ValueError) as e:
+        log_warning(f"Cannot read {path}: {e}")
+        return None
+    return len(index.folder_ids), len(index.url_ids)
+
+
+def find_duplicate_urls(index: TreeIndex) -> Dict[str, List[str]]:
+    """Return {url: [bookmark ids…]} for every URL bookmarked more than once.
+
+    One pass bucketing into a dict: O(N) with C-level string hashing (str
+    caches its hash), ids listed in tree order.
+    """
+    buckets: Dict[str, List[str]] = {}
+    nodes = index.nodes
+    for uid in index.url_ids:
+        url = nodes[uid].get("url")
+        if url is not None:
+            buckets.setdefault(url, []).append(uid)
+    return {url: ids for url, ids in buckets.items() if len(ids) > 1}
+
+
+_NAME_PREFIX = "name:"  # selector prefix for an exact folder name
+
+
+def compile_selector(selector: str) -> Callable[[Node], bool]:
+    """Return a predicate telling whether a node matches *selector*.
+
+    The selector kind is decided here, once; the returned lambda does no
+    parsing or branching.  A numeric selector matches by id only (callers
+    wanting the CLI's fall-back to name fragments test that separately).
+    """
+    if selector.startswith(_NAME_PREFIX):
+        name = selector[len(_NAME_PREFIX):]
+        return lambda n: n.get("name") == name
+    if selector.isdigit():
+        return lambda n: n.get("id") == selector
+    frag = selector.lower()
+    return lambda n: frag in (n.get("name") or "").lower()
+
+
+def resolve_selectors(index: TreeIndex, selectors: Sequence[str]) -> Dict[str, List[Node]]:
+    """Return {selector: [matching folder nodes…]} for many selectors at once.
+
+    Folder ids and `name:EXACT` are answered from the index tables; all
+    name-fragment selectors share one pass over the lower-cased folder
+    names (a lone fragment uses the `str.find` buffer scan instead).
+    Matches are listed in tree order.
+    """
+    results: Dict[str, List[Node]] = {sel: [] for sel in selectors}
+    fragments: List[Tuple[str, str]] = []
+    for sel in results:
+        if sel in index.folders:  # folder id
+            results[sel].append(index.nodes[sel])
+        elif sel.startswith(_NAME_PREFIX):
+            name = sel[len(_NAME_PREFIX):]
+            results[sel] = [
+                index.nodes[fid]
+                for fid in index.names_lower.get(name.lower(), ())
+                if index.folders[fid].name == name
+            ]
+        else:  # match by (case-insensitive) substring of name
+            fragments.append((sel, sel.lower()))
+    if len(fragments) == 1:
+        sel = fragments[0][0]
+        results[sel] = [index.nodes[fid] for fid in index.find_by_name_fragment(sel)]
+    elif fragments:
+        for node, name_lc in zip(index.folder_nodes, index.folder_names_lower):
+            for sel, frag in fragments:
+                if frag in name_lc:
+                    results[sel].append(node)
+    return results
+
+
+def _single_match(index: TreeIndex, selector: str, matches: List[Node]) -> Node:
+    """Return the only element of *matches* or exit with the CLI error."""
     if not matches:
         log_error(f"No bookmark folder matches selector '{selector}'")
         sys.exit(1)
     if len(matches) > 1:
-        names = ", ".join(f"{'/'.join(p)} (id:{f['id']})" for f, _, p in folders if f in matches)
+        names = ", ".join(
+            f"{'/'.join(index.path_parts(f['id']))} (id:{f['id']})" for f in matches
+        )
         log_error(
             "ERROR: ambiguous bookmark folder selector, expected one folder to "
             f"match while all these folders match: {names}"
@@ -170,121 +952,440 @@ def _match_selector(folders: List[Tuple[Node, str, List[str]]], selector: str) -
     return matches[0]
 
 
+_STREAM_NODE_KEYS = ("id", "name", "type", "url")
+
+
+def _stream_folder_children(path: Path, selector: str) -> Optional[List[Node]]:
+    """Stream *path* with ijson; return the children of the folder *selector* picks.
+
+    Only the direct children of the currently open folders are held, each
+    reduced to id/name/type/url (sub-folders without their contents), and
+    an id selector stops reading as soon as its folder closes.  Returns
+    None unless exactly one folder matches; the caller then resolves the
+    selector the normal way, which also yields the usual error messages.
+    """
+    log_info(f"Streaming bookmarks from {path}")
+    by_id = selector.isdigit()
+    if by_id:  # ids win; the name-fragment match is only the fall-back
+        frag = selector.lower()
+        matches_name = lambda n: frag in (n.get("name") or "").lower()  # noqa: E731
+    else:
+        matches_name = compile_selector(selector)
+    found: List[List[Node]] = []
+    stack: List[Tuple[str, Node, List[Node]]] = []  # (prefix, node, children)
+    with path.open("rb") as fh:
+        for prefix, event, value in _ijson.parse(fh):
+            if event == "start_map":
+                if prefix.endswith(".children.item") or (
+                    prefix.startswith("roots.") and prefix.count(".") == 1
+                ):
+                    stack.append((prefix, {}, []))
+            elif event == "end_map":
+                if not stack or stack[-1][0] != prefix:
+                    continue
+                _, node, children = stack.pop()
+                if node.get("type") == "folder":
+                    if by_id and node.get("id") == selector:
+                        return children
+                    if matches_name(node):
+                        found.append(children)
+                        if len(found) > 1 and not by_id:
+                            return None  # ambiguous
+                if stack:
+                    stack[-1][2].append(node)
+            elif event == "string" and stack:
+                top_prefix, node, _ = stack[-1]
+                key = prefix[len(top_prefix) + 1:]
+                if key in _STREAM_NODE_KEYS:
+                    node[key] = value
+    return found[0] if len(found) == 1 else None
+
+
+def _match_selector(index: TreeIndex, selector: str) -> Node:
+    """Return the single matching folder node for selector."""
+    return _single_match(index, selector, resolve_selectors(index, [selector])[selector])
+
+
 # ---------------------------------------------------------------------------#
 # Format helpers                                                             #
 # ---------------------------------------------------------------------------#
-def _folder_path(path_parts: List[str]) -> str:
+def _folder_path(path_parts: Sequence[str]) -> str:
     return "/" + "/".join(path_parts)
 
 
-def _print_folder_line(
-    folder: Node,
-    parent_id: Optional[str],
-    path_parts: List[str],
-    args: argparse.Namespace,
-):
-    path_str = _folder_path(path_parts)
-    if args.format == "path":
-        suffix = f" (id:{folder['id']})" if args.show_ids else ""
-        print(path_str + suffix)
-    elif args.format == "csv":
-        print(f'{folder["id"]},{parent_id or ""},"{folder["name"]}"')
-    elif args.format == "jsonl":
-        obj = {
-            "id": folder["id"],
-            "parent_id": parent_id,
-            "name": folder["name"],
-            "path": path_str,
-        }
-        print(json.dumps(obj, ensure_ascii=False))
+# All JSON output is compact UTF-8 (no spaces after "," / ":"): the only
+# layout orjson can produce, so stdlib (and jq) output is byte-identical.
+if _orjson is not None:
+
+    def _json_line(obj: Any) -> str:
+        return _orjson.dumps(obj).decode("utf-8")
+
+else:  # same as json.dumps(...) minus its per-call argument handling
+    _json_line = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_LINES_BATCH = 4096  # output lines per write() call
+
+# ls --contents-type -> node types shown
+_CONTENTS_TYPES = {
+    "all": ("folder", "url"),
+    "folders": ("folder",),
+    "bookmarks": ("url",),
+}
+
+
+def _emit_lines(lines: Iterable[str], out: Optional[TextIO] = None) -> None:
+    """Write *lines* (without "\\n") with one write() per batch of lines.
+
+    All sub-commands print through here instead of one print() – lock,
+    format, write – per node.
+    """
+    write = (out or sys.stdout).write
+    batch: List[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= _LINES_BATCH:
+            batch.append("")
+            write("\n".join(batch))
+            batch.clear()
+    if batch:
+        batch.append("")
+        write("\n".join(batch))
+
+
+_JSONL_BATCH_BYTES = 1 << 16  # bytes per write() for the orjson path
+
+
+def _emit_jsonl(objs: Iterable[Any], out: Optional[TextIO] = None) -> None:
+    """Write one JSON document per line.
+
+    With orjson and the real stdout, documents are encoded straight to
+    UTF-8 bytes (newline appended in C) and written to sys.stdout.buffer in
+    ~64 KiB batches – no decode/encode round-trip through the text layer.
+    Otherwise they are batched as text like `_emit_lines`.
+    """
+    buffer = getattr(sys.stdout, "buffer", None) if out is None else None
+    if _orjson is None or buffer is None:
+        _emit_lines(map(_json_line, objs), out)
+        return
+    sys.stdout.flush()  # anything already written as text goes first
+    dumps, option = _orjson.dumps, _orjson.OPT_APPEND_NEWLINE
+    batch = bytearray()
+    for obj in objs:
+        batch += dumps(obj, option=option)
+        if len(batch) >= _JSONL_BATCH_BYTES:
+            buffer.write(batch)
+            batch.clear()
+    if batch:
+        buffer.write(batch)
+
+
+def _folder_obj(folder: Node, parent_id: Optional[str], path_str: str) -> Dict[str, Any]:
+    """The lsd --format jsonl record of one folder."""
+    return {
+        "id": folder["id"],
+        "parent_id": parent_id,
+        "name": folder["name"],
+        "path": path_str,
+    }
+
+
+if _orjson is not None:
+
+    def _folder_json(folder: Node, parent_id: Optional[str], path_str: str) -> str:
+        """`_json_line(_folder_obj(...))`: the lsd --format jsonl folder line."""
+        return _json_line(_folder_obj(folder, parent_id, path_str))
+
+else:  # format the fixed record directly: no dict, no generic encoder walk
+    _json_str = json.encoder.encode_basestring  # quotes + escapes, keeps UTF-8
+
+    def _folder_json(folder: Node, parent_id: Optional[str], path_str: str) -> str:
+        """`_json_line(_folder_obj(...))`: the lsd --format jsonl folder line."""
+        return '{"id":%s,"parent_id":%s,"name":%s,"path":%s}' % (
+            _json_str(folder["id"]),
+            "null" if parent_id is None else _json_str(parent_id),
+            _json_str(folder["name"]),
+            _json_str(path_str),
+        )
+
+
+_CSV_HEADER = ("id", "parent_id", "name")
+
+
+_FolderFormatter = Callable[[Node, Optional[str], str], str]
+
+
+def _folder_formatter(fmt: str, show_ids: bool = False) -> _FolderFormatter:
+    """Return a straight-line `line(folder, parent_id, path_str)` for *fmt*.
+
+    The format (and --show-ids) is decided here, once per listing, so the
+    per-folder call has no branches left.  Only the path format goes line
+    by line; csv and jsonl have their own writers.
+    """
+    if fmt == "path":
+        if show_ids:
+            return lambda folder, parent_id, path_str: f"{path_str} (id:{folder['id']})"
+        return lambda folder, parent_id, path_str: path_str
     else:
-        raise ValueError(args.format)
-
-
-def _print_node(
-    node: Node,
-    args: argparse.Namespace,
-):
-    if node["type"] == "folder":
-        if args.contents_type in ("all", "folders"):
-            if args.contents_format == "urls":
-                print(_folder_path([node["name"]]))
-            elif args.contents_format == "urls_titles":
-                print(f"{_folder_path([node['name']])}\t{node['name']}")
-            elif args.contents_format == "markdown":
-                print(f"* **{node['name']}**")
-            elif args.contents_format == "jsonl":
-                print(json.dumps(node, ensure_ascii=False))
-    elif node["type"] == "url":
-        if args.contents_type in ("all", "bookmarks"):
-            if args.contents_format == "urls":
-                print(node["url"])
-            elif args.contents_format == "urls_titles":
-                print(f"{node['url']}\t{node['name']}")
-            elif args.contents_format == "markdown":
-                print(f"* [{node['name']}]({node['url']})")
-            elif args.contents_format == "jsonl":
-                print(json.dumps(node, ensure_ascii=False))
+        raise ValueError(fmt)
+
+
+# (node type, --contents-format) -> line formatter; looked up once per
+# command so the per-child work is one dict hit and one call.
+_NODE_FORMATTERS: Dict[Tuple[str, str], Callable[[Node], str]] = {
+    ("folder", "urls"): lambda n: "/" + n["name"],
+    ("folder", "urls_titles"): lambda n: f"/{n['name']}\t{n['name']}",
+    ("folder", "markdown"): lambda n: f"* **{n['name']}**",
+    ("folder", "jsonl"): _json_line,
+    ("url", "urls"): lambda n: n["url"],
+    ("url", "urls_titles"): lambda n: f"{n['url']}\t{n['name']}",
+    ("url", "markdown"): lambda n: f"* [{n['name']}]({n['url']})",
+    ("url", "jsonl"): _json_line,
+}
+
+
+def _node_formatters(args: argparse.Namespace) -> Dict[str, Callable[[Node], str]]:
+    """{node type: formatter} for the types --contents-type lets through."""
+    fmt = args.contents_format
+    return {t: _NODE_FORMATTERS[(t, fmt)] for t in _CONTENTS_TYPES[args.contents_type]}
+
+
+def _iter_node_lines(children: Iterable[Node], args: argparse.Namespace) -> Iterator[str]:
+    """ls output lines for *children*, skipping types --contents-type hides."""
+    formatters = _node_formatters(args)
+    get = formatters.get
+    for child in children:
+        line_of = get(child["type"])
+        if line_of is not None:
+            yield line_of(child)
 
 
 # ---------------------------------------------------------------------------#
 # Sub-commands                                                               #
 # ---------------------------------------------------------------------------#
-def cmd_list_dirs(args: argparse.Namespace) -> None:
+def _bookmarks_path(args: argparse.Namespace) -> Path:
+    """Resolve the Bookmarks file from CLI args or exit with an error."""
     bm_path = _detect_bookmarks_file(args.user_data_dir, args.profile) if not args.bookmarks_file else Path(args.bookmarks_file)
     if bm_path is None:
         log_error("Bookmarks file not found. Use --bookmarks-file or --user-data-dir.")
         sys.exit(1)
-    data = _load_bookmarks(bm_path)
+    return bm_path
 
-    roots = data["roots"]
-    folders_iter = []
-    for root_name, root in roots.items():
-        if isinstance(root, dict):
-            folders_iter.extend(_iter_folders(root, None, [root_name]))
 
-    # limit to subtree?
-    if args.selector:
-        sel_folder = _match_selector(folders_iter, args.selector)
-        folders_iter = list(_iter_folders(sel_folder, None, []))
+_FolderRow = Tuple[Node, Optional[str], Tuple[str, ...]]  # folder, parent_id, path
+_FolderRows = Iterable[_FolderRow]
+
+
+def _iter_path_strs(folders: _FolderRows) -> Iterator[Tuple[Node, Optional[str], str]]:
+    """Yield (folder, parent_id, "/…/name") for pre-order *folders*.
+
+    A folder's string is its parent's plus "/name" – one concatenation
+    instead of re-joining the whole shared prefix for every folder.
+    """
+    path_strs: Dict[str, str] = {}
+    for folder, parent_id, path_parts in folders:
+        prefix = path_strs.get(parent_id) if parent_id is not None else None
+        if prefix is None:  # a root, or the top of a listed subtree
+            path_str = _folder_path(path_parts)
+        else:
+            path_str = prefix + "/" + folder["name"]
+        path_strs[folder["id"]] = path_str
+        yield folder, parent_id, path_str
+
+
+def _iter_folder_json(folders: _FolderRows, with_bookmarks: bool) -> Iterator[str]:
+    """lsd --format jsonl lines: folders, each followed by its bookmarks."""
+    for folder, parent_id, path_str in _iter_path_strs(folders):
+        yield _folder_json(folder, parent_id, path_str)
+        if with_bookmarks:
+            for child in folder.get("children") or _NO_CHILDREN:
+                if child["type"] == "url":
+                    yield _json_line(child)
+
 
-    for folder, parent_id, path_parts in folders_iter:
-        _print_folder_line(folder, parent_id, path_parts, args)
+def _iter_folder_rows(folders: _FolderRows, with_bookmarks: bool) -> Iterator[Tuple[str, str, str]]:
+    """lsd --format csv rows (id, parent_id, name): folders, then bookmarks."""
+    for folder, parent_id, _ in folders:
+        fid = folder["id"]
+        yield fid, parent_id or "", folder["name"]
+        if with_bookmarks:
+            for child in folder.get("children") or _NO_CHILDREN:
+                if child["type"] == "url":
+                    yield child["id"], fid, child["name"]
+
+
+def _iter_folder_lines(folders: _FolderRows, args: argparse.Namespace) -> Iterator[str]:
+    """lsd --format path lines: folders, each followed by its bookmarks."""
+    folder_line = _folder_formatter(args.format, args.show_ids)
+    for folder, parent_id, path_str in _iter_path_strs(folders):
+        # re-used as the prefix of the folder's bookmarks
+        yield folder_line(folder, parent_id, path_str)
         if args.with_bookmarks:
-            for child in _iter_children(folder):
+            for child in folder.get("children") or _NO_CHILDREN:
                 if child["type"] == "url":
-                    cname = child["name"]
-                    cpath = _folder_path(path_parts + [cname])
-                    if args.format == "path":
-                        print(cpath)
-                    elif args.format == "csv":
-                        print(f'{child["id"]},{folder["id"]},"{cname}"')
-                    elif args.format == "jsonl":
-                        print(json.dumps(child, ensure_ascii=False))
+                    yield f"{path_str}/{child['name']}"
+
+
+def _folders_by_id(
+    bm_path: Path, selectors: Sequence[str], args: argparse.Namespace, folders_only: bool
+) -> Tuple[Optional[List[_FolderRow]], Optional[Dict[str, Any]]]:
+    """Find the folders of all-numeric *selectors* without building an index.
+
+    Only taken when no index is cached yet: the file is parsed and each id
+    found by an early-exit DFS.  Returns (found folders or None, parsed
+    data or None); on None the caller resolves through the index (built
+    from that data, so nothing is parsed twice), which also handles the
+    name-fragment fall-back and the error messages.
+    """
+    if not all(sel.isdigit() for sel in selectors):
+        return None, None
+    if cached_index(bm_path, folders_only=folders_only, disk_cache=not args.no_cache):
+        return None, None
+    data = _load_bookmarks(bm_path)
+    found = []
+    for sel in selectors:
+        hit = _find_folder_by_id(data["roots"], sel)
+        if hit is None:
+            return None, data
+        found.append(hit)
+    return found, data
+
+
+def cmd_list_dirs(args: argparse.Namespace) -> None:
+    bm_path = _bookmarks_path(args)
+    found, data = None, None
+    if args.selector:
+        found, data = _folders_by_id(bm_path, [args.selector], args, not args.with_bookmarks)
+    if found:
+        folders: _FolderRows = _iter_folders(found[0][0])
+    else:
+        index = load_index(
+            bm_path,
+            folders_only=not args.with_bookmarks,
+            disk_cache=not args.no_cache,
+            data=data,
+        )
+        # limit to subtree?
+        top_id = _match_selector(index, args.selector)["id"] if args.selector else None
+        folders = index.list_all_folders(top_id)
+
+    if args.format == "jsonl":
+        _emit_lines(_iter_folder_json(folders, args.with_bookmarks))
+    elif args.format == "csv":
+        # the C writer quotes/escapes; sys.stdout's buffer batches the writes
+        writer = csv.writer(sys.stdout, lineterminator="\n")
+        if args.csv_header:
+            writer.writerow(_CSV_HEADER)
+        writer.writerows(_iter_folder_rows(folders, args.with_bookmarks))
+    else:
+        _emit_lines(_iter_folder_lines(folders, args))
+
+
+# Without orjson, `ls` streams files at least this big on its own, when it
+# can and no index is cached: stdlib json is slow to parse them whole, and
+# whole-file dicts cost far more RSS than the file.  orjson's full load is
+# faster than streaming except for folders near the start of the file.
+_STREAMING_THRESHOLD = 25 << 20
+
+
+def _auto_streaming(bm_path: Path, args: argparse.Namespace) -> bool:
+    return (
+        _orjson is None
+        and _ijson is not None
+        and args.contents_format != "jsonl"
+        and len(args.selectors) == 1
+        and bm_path.stat().st_size >= _STREAMING_THRESHOLD
+        and cached_index(bm_path, disk_cache=not args.no_cache) is None
+    )
+
+
+def _ls_streaming(bm_path: Path, args: argparse.Namespace) -> bool:
+    """Answer `ls --streaming` from the ijson stream; False = use the index."""
+    if _ijson is None:
+        log_warning("--streaming needs the ijson module; parsing the whole file")
+        return False
+    if args.contents_format == "jsonl" or len(args.selectors) != 1:
+        log_info("--streaming only serves a single selector in non-jsonl formats")
+        return False
+    children = _stream_folder_children(bm_path, args.selectors[0])
+    if children is None:
+        return False
+    _emit_lines(_iter_node_lines(children, args))
+    return True
 
 
 def cmd_ls(args: argparse.Namespace) -> None:
-    bm_path = _detect_bookmarks_file(args.user_data_dir, args.profile) if not args.bookmarks_file else Path(args.bookmarks_file)
-    if bm_path is None:
-        log_error("Bookmarks file not found. Use --bookmarks-file or --user-data-dir.")
+    bm_path = _bookmarks_path(args)
+    if not args.selectors:
+        log_error("A folder selector is required for ls sub-command.")
         sys.exit(1)
-    data = _load_bookmarks(bm_path)
+    if len(args.selectors) == 1 and _use_jq(args):
+        if _ls_with_jq(bm_path, args.selectors[0], args):
+            return
+    if (args.streaming or _auto_streaming(bm_path, args)) and _ls_streaming(bm_path, args):
+        return
+    found, data = _folders_by_id(bm_path, args.selectors, args, False)
+    if found:
+        folder_nodes = [folder for folder, _, _ in found]
+    else:
+        index = load_index(bm_path, disk_cache=not args.no_cache, data=data)
+        # resolve every selector in one go (and fail before printing anything)
+        resolved = resolve_selectors(index, args.selectors)
+        folder_nodes = [_single_match(index, sel, resolved[sel]) for sel in args.selectors]
 
-    # collect folders once to resolve selector
-    all_folders = []
-    for root_name, root in data["roots"].items():
-        if isinstance(root, dict):
-            all_folders.extend(_iter_folders(root, None, [root_name]))
+    # list direct children
+    children = (c for f in folder_nodes for c in _iter_children(f))
+    if args.contents_format == "jsonl":
+        wanted = _CONTENTS_TYPES[args.contents_type]
+        _emit_jsonl(c for c in children if c["type"] in wanted)
+    else:
+        _emit_lines(_iter_node_lines(children, args))
 
-    if not args.selector:
-        log_error("A folder selector is required for ls sub-command.")
+
+def cmd_get(args: argparse.Namespace) -> None:
+    bm_path = _bookmarks_path(args)
+    node = fast_find_by_id(bm_path, args.id)
+    if node is None:
+        node = load_index(bm_path, disk_cache=not args.no_cache).find_by_id(args.id)
+    if node is None:
+        log_error(f"No bookmark node with id '{args.id}'")
         sys.exit(1)
+    print(_json_line(node))
 
-    folder_node = _match_selector(all_folders, args.selector)
 
-    # list direct children
-    for child in _iter_children(folder_node):
-        _print_node(child, args)
+def cmd_profiles(args: argparse.Namespace) -> None:
+    if args.bookmarks_file:
+        paths = [Path(args.bookmarks_file)]
+    else:
+        paths = discover_bookmarks_files([args.user_data_dir] if args.user_data_dir else None)
+    if not paths:
+        log_error("No Bookmarks files found. Use --user-data-dir.")
+        sys.exit(1)
+    summary = functools.partial(_profile_summary, disk_cache=not args.no_cache)
+    for path, counts in zip(paths, _map_profiles(summary, paths)):
+        if counts is not None:
+            print(f"{path}\t{counts[0]}\t{counts[1]}")
+
+
+def cmd_dupes(args: argparse.Namespace) -> None:
+    index = load_index(_bookmarks_path(args), disk_cache=not args.no_cache)
+    dupes = find_duplicate_urls(index)
+    if args.format == "jsonl":
+        _emit_jsonl(
+            {
+                "url": url,
+                "ids": ids,
+                "folders": [index.path_str(index.parent_ids[uid]) for uid in ids],
+            }
+            for url, ids in dupes.items()
+        )
+        return
+    _emit_lines(
+        line
+        for url, ids in dupes.items()
+        for line in (
+            url,
+            *(f"\t{index.path_str(index.parent_ids[uid])} (id:{uid})" for uid in ids),
+        )
+    )
 
 
 # ---------------------------------------------------------------------------#
@@ -309,6 +1410,17 @@ def _build_parser() -> argparse.ArgumentParser:
         type=str,
         help="Explicit path to Bookmarks file (overrides user-data-dir/profile)",
     )
+    p.add_argument(
+        "--engine",
+        choices=["python", "jq", "auto"],
+        default="python",
+        help="Query engine for read-only look-ups (auto = jq when installed)",
+    )
+    p.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Neither read nor write the on-disk index cache",
+    )
 
     sub = p.add_subparsers(dest="cmd", required=True)
 
@@ -326,6 +1438,11 @@ def _build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="For --format path: append (id:XX)",
     )
+    p_dirs.add_argument(
+        "--csv-header",
+        action="store_true",
+        help="For --format csv: start with an id,parent_id,name header row",
+    )
     p_dirs.add_argument(
         "--with-bookmarks", "--bookmarks",
         action="store_true",
@@ -334,7 +1451,7 @@ def _build_parser() -> argparse.ArgumentParser:
     p_dirs.add_argument(
         "selector",
         nargs="?",
-        help="Folder selector (id or name fragment) to start from",
+        help="Folder selector (id, name fragment or name:EXACT) to start from",
     )
     p_dirs.set_defaults(func=cmd_list_dirs)
 
@@ -355,9 +1472,45 @@ def _build_parser() -> argparse.ArgumentParser:
         default="urls_titles",
         help="How to format each child",
     )
-    p_ls.add_argument("selector", help="Folder selector (id or name fragment)")
+    p_ls.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Stream the file with ijson, holding only the path being read "
+        "(single selector, not with -F jsonl; automatic without orjson for files "
+        "over 25 MiB without a cached index)",
+    )
+    p_ls.add_argument(
+        "selectors",
+        nargs="+",
+        metavar="selector",
+        help="Folder selector (id, name fragment or name:EXACT); several "
+        "selectors list each folder in turn",
+    )
     p_ls.set_defaults(func=cmd_ls)
 
+    # profiles
+    p_prof = sub.add_parser(
+        "profiles",
+        help="List every profile's Bookmarks file with folder and bookmark counts",
+    )
+    p_prof.set_defaults(func=cmd_profiles)
+
+    # get
+    p_get = sub.add_parser("get", help="Print one node (bookmark or folder) by id as JSON")
+    p_get.add_argument("id", help="Node id")
+    p_get.set_defaults(func=cmd_get)
+
+    # dupes
+    p_dupes = sub.add_parser("dupes", help="List URLs bookmarked more than once")
+    p_dupes.add_argument(
+        "-F",
+        "--format",
+        choices=["path", "jsonl"],
+        default="path",
+        help="Output format",
+    )
+    p_dupes.set_defaults(func=cmd_dupes)
+
     return p
 
 
@@ -380,6 +1533,9 @@ if __name__ == "__main__":  # pragma: no cover
         main()
     except KeyboardInterrupt:
         log_warning("Interrupted by user")
+    except BrokenPipeError:  # e.g. `| head`; keep the exit quiet
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
 
 exit
 
@@ -4,16 +4,34 @@
 Tab URL Collector Script
 Collects URLs from browser tabs using xclip and xdotool.
 Requires: xclip, xdotool
+Optional: tkinter (stdlib, often packaged as python3-tk) - if importable, the
+clipboard is read in-process instead of forking xclip for every tab.
+Optional: python-xlib - if importable, the initial wait for browser focus
+sleeps on X focus-change events instead of polling xdotool + xprop.
 """
 
 import subprocess
 import time
 import sys
 import argparse
+import functools
 import re
-from typing import List, Optional, Callable, Dict, Pattern
+import urllib.parse
+from typing import List, Optional, Callable, Dict, Pattern, Set, Tuple
 # No enum needed anymore, we'll use strings directly
 
+try:  # optional: in-process clipboard reads through Tk's X selection support
+    import tkinter as _tk
+except ImportError:  # pragma: no cover - depends on environment
+    _tk = None
+
+try:  # optional: event-driven wait for browser focus
+    import Xlib.display as _xlib_display
+    import Xlib.error as _xlib_error
+    import Xlib.X as _xlib_X
+except ImportError:  # pragma: no cover - depends on environment
+    _xlib_display = None
+
 def parse_arguments() -> argparse.Namespace:
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Collect URLs from browser tabs')
@@ -49,8 +67,42 @@ def log_verbose(message: str, verbose: bool) -> None:
     if verbose:
         print(f"INFO: {message}", file=sys.stderr)
 
-def get_focused_window_class() -> str:
-    """Get the class of the currently focused window"""
+# (time.monotonic() of the query, window class) of the last focus query
+_last_focus_check: Optional[Tuple[float, str]] = None
+
+def get_focused_window_class(max_age: float = 0.0) -> str:
+    """Get the class of the currently focused window
+
+    With max_age > 0 an answer at most that many seconds old is reused
+    instead of spawning xdotool + xprop again.
+    """
+    global _last_focus_check
+    if max_age > 0 and _last_focus_check is not None:
+        checked_at, window_class = _last_focus_check
+        if time.monotonic() - checked_at < max_age:
+            return window_class
+    window_class = _query_focused_window_class()
+    _last_focus_check = (time.monotonic(), window_class)
+    return window_class
+
+# Cleared when the installed xdotool predates the getwindowclassname command
+_xdotool_has_classname = True
+
+def _query_focused_window_class() -> str:
+    """Ask the X server for the class of the currently focused window"""
+    global _xdotool_has_classname
+    if _xdotool_has_classname:
+        # One fork: xdotool chains the lookup of the active window and its class
+        result = subprocess.run(
+            ['xdotool', 'getactivewindow', 'getwindowclassname'],
+            capture_output=True, text=True
+        )
+        if result.returncode == 0:
+            return result.stdout.strip().lower()
+        if 'getwindowclassname' not in result.stderr:
+            return ""
+        _xdotool_has_classname = False
+
     try:
         # Get window ID of focused window
         window_id = subprocess.run(
@@ -72,28 +124,84 @@ class BrowserFocusLostError(Exception):
     """Exception raised when browser focus is lost during operation"""
     pass
 
-def is_browser_focused(verbose: bool = False) -> bool:
+BROWSER_CLASSES = ('chromium', 'chrome', 'firefox')
+# One C-level scan instead of a Python loop of substring tests
+_BROWSER_CLASS_RE = re.compile('|'.join(map(re.escape, BROWSER_CLASSES)), re.IGNORECASE)
+
+def is_browser_class(window_class: str) -> bool:
+    """Check if a WM_CLASS string belongs to a supported browser"""
+    return _BROWSER_CLASS_RE.search(window_class) is not None
+
+def is_browser_focused(verbose: bool = False, max_age: float = 0.0) -> bool:
     """Check if a supported browser window is currently focused"""
-    browser_classes = ['chromium', 'chrome', 'firefox']
-    current_window = get_focused_window_class()
+    current_window = get_focused_window_class(max_age)
     
     if verbose:
         log_verbose(f"Current focused window: {current_window}", verbose)
     
-    return any(browser in current_window for browser in browser_classes)
+    return is_browser_class(current_window)
+
+def _xlib_active_window_class(display, root, net_active_window) -> str:
+    """Read WM_CLASS of the window named by the root's _NET_ACTIVE_WINDOW"""
+    try:
+        active = root.get_full_property(net_active_window, _xlib_X.AnyPropertyType)
+        if not active or not active.value:
+            return ""
+        window = display.create_resource_object('window', active.value[0])
+        wm_class = window.get_wm_class()
+    except _xlib_error.XError:  # window went away between the two requests
+        return ""
+    return ' '.join(wm_class).lower() if wm_class else ""
+
+def _wait_for_browser_focus_xlib(verbose: bool) -> bool:
+    """Block on X PropertyNotify events until a browser is the active window
+
+    Returns False if python-xlib is missing or no X display can be opened,
+    so the caller can fall back to polling.
+    """
+    if _xlib_display is None:
+        return False
+    try:
+        display = _xlib_display.Display()
+    except Exception:  # Xlib raises several types for "no usable $DISPLAY"
+        return False
+    try:
+        root = display.screen().root
+        net_active_window = display.intern_atom('_NET_ACTIVE_WINDOW')
+        root.change_attributes(event_mask=_xlib_X.PropertyChangeMask)
+        while True:
+            current_window = _xlib_active_window_class(display, root, net_active_window)
+            log_verbose(f"Current focused window: {current_window}", verbose)
+            if is_browser_class(current_window):
+                return True
+            # Sleep until the window manager announces a new active window
+            while True:
+                event = display.next_event()
+                if event.type == _xlib_X.PropertyNotify and event.atom == net_active_window:
+                    break
+    finally:
+        display.close()
 
 def wait_for_browser_focus(verbose: bool) -> None:
     """Wait until a supported browser window is focused"""
+    if _wait_for_browser_focus_xlib(verbose):
+        log_verbose(f"Detected browser window is focused", verbose)
+        return
+
+    # Polling fallback: react quickly if focus is about to arrive, then back
+    # off so an idle wait does not keep forking xdotool + xprop
+    poll_delay = 0.05
     while True:
         if is_browser_focused(verbose):
             log_verbose(f"Detected browser window is focused", verbose)
             break
         
-        time.sleep(0.5)
+        time.sleep(poll_delay)
+        poll_delay = min(poll_delay * 2, 1.0)
 
-def assert_browser_focused(verbose: bool) -> None:
+def assert_browser_focused(verbose: bool, max_age: float = 0.0) -> None:
     """Assert that a browser window is focused, raise exception if not"""
-    if not is_browser_focused(verbose):
+    if not is_browser_focused(verbose, max_age):
         raise BrowserFocusLostError("Browser window focus lost during operation")
 
 def paste_to_clipboard(content: str):
@@ -124,8 +232,32 @@ def paste_to_clipboard(content: str):
         raise
 
 
+# Hidden (never mapped) Tk root used for clipboard reads; None = not created
+# yet, False = Tk unavailable (no tkinter, no $DISPLAY ...), use xclip.
+_tk_root = None
+
+def _get_clipboard_tk() -> Optional[str]:
+    """Read the CLIPBOARD selection in-process via Tk; None if Tk can't be used"""
+    global _tk_root
+    if _tk_root is None:
+        try:
+            _tk_root = _tk.Tk()
+            _tk_root.withdraw()
+        except Exception:  # TclError without a display, missing tkinter ...
+            _tk_root = False
+    if _tk_root is False:
+        return None
+    try:
+        return _tk_root.clipboard_get().strip()
+    except _tk.TclError:  # empty clipboard or not text
+        return ""
+
 def get_clipboard() -> str:
-    """Get clipboard contents using xclip"""
+    """Get clipboard contents (in-process via Tk when possible, else xclip)"""
+    if _tk is not None:
+        content = _get_clipboard_tk()
+        if content is not None:
+            return content
     try:
         result = subprocess.run(['xclip', '-o', '-selection', 'clipboard'],
                               capture_output=True, text=True, check=True)
@@ -135,85 +267,117 @@ def get_clipboard() -> str:
         return ""
 
 # URL processing functions
+YOUTUBE_DOMAINS = ('youtube.com', 'youtu.be')
+AMAZON_DOMAINS = ('amazon.com', 'amazon.de', 'amazon.co.uk', 'amazon.ca', 'amazon.fr',
+                  'amazon.it', 'amazon.es', 'amazon.jp', 'amazon.in')
+# "."-prefixed, so that one C-level str.endswith(tuple) call on "." + host
+# matches a domain and all its subdomains (www., m., music., smile. ...)
+_YOUTUBE_SUFFIXES = tuple('.' + domain for domain in YOUTUBE_DOMAINS)
+_AMAZON_SUFFIXES = tuple('.' + domain for domain in AMAZON_DOMAINS)
+
+def _split_url(url: str) -> Optional[urllib.parse.SplitResult]:
+    """Split the URL once into its components (None if it is malformed)"""
+    try:
+        return urllib.parse.urlsplit(url)
+    except ValueError:  # e.g. malformed IPv6 literal - not a URL we handle
+        return None
+
+def _parts_host(parts: Optional[urllib.parse.SplitResult]) -> str:
+    """Return the lower-cased host name of split URL parts ('' if there is none)"""
+    if parts is None:
+        return ''
+    return parts.hostname or ''
+
+def url_host(url: str) -> str:
+    """Return the lower-cased host name of the URL ('' if there is none)"""
+    return _parts_host(_split_url(url))
+
 def is_youtube_url(url: str) -> bool:
     """Check if the URL is from YouTube"""
-    youtube_domains = ['youtube.com', 'www.youtube.com', 'youtu.be']
-    for domain in youtube_domains:
-        if domain in url:
-            return True
-    return False
+    return ('.' + url_host(url)).endswith(_YOUTUBE_SUFFIXES)
 
 def is_amazon_url(url: str) -> bool:
     """Check if the URL is from Amazon"""
-    amazon_domains = ['amazon.com', 'amazon.de', 'amazon.co.uk', 'amazon.ca', 'amazon.fr', 
-                     'amazon.it', 'amazon.es', 'amazon.jp', 'amazon.in']
-    for domain in amazon_domains:
-        if domain in url:
-            return True
-    return False
+    return ('.' + url_host(url)).endswith(_AMAZON_SUFFIXES)
+
+_AMAZON_DP_RE = re.compile(r'/dp/[A-Z0-9]{10}')
 
 def clean_url(url: str) -> str:
     """Remove query parameters from URL (basic cleaning)"""
     return url.split('?')[0]
 
-def clean_youtube_url(url: str) -> str:
-    """Clean YouTube URL by keeping only the video ID parameter"""
-    if 'youtu.be/' in url:
-        # For youtu.be short links, just return as is or clean it
+# The _*_parts helpers below take the URL together with its urlsplit() parts,
+# so process_url() parses every URL exactly once and then only slices fields.
+
+def _youtube_video_id(parts: urllib.parse.SplitResult) -> Optional[str]:
+    """Return the raw value of the first v= query parameter, if any"""
+    for param in parts.query.split('&'):
+        if param.startswith('v='):
+            return param[2:].split('=')[0] or None
+    return None
+
+def _clean_youtube_parts(url: str, parts: urllib.parse.SplitResult) -> str:
+    if _parts_host(parts).endswith('youtu.be'):
+        # For youtu.be short links, just drop the query parameters
         return clean_url(url)
     
     # For youtube.com links, keep only the v parameter
-    base_url, _, query = url.partition('?')
-    if not query:
+    if not parts.query:
         return url
     
-    params = query.split('&')
-    video_id = None
-    for param in params:
-        if param.startswith('v='):
-            video_id = param.split('=')[1]
-            break
-    
+    base_url = url.partition('?')[0]
+    video_id = _youtube_video_id(parts)
     if video_id:
         return f"{base_url}?v={video_id}"
     return base_url
 
+def _minimize_youtube_parts(url: str, parts: urllib.parse.SplitResult) -> str:
+    if _parts_host(parts).endswith('youtu.be'):
+        video_id = parts.path[1:]
+    else:
+        video_id = _youtube_video_id(parts)
+    
+    if video_id:
+        return f"https://youtu.be/{video_id}"
+    return _clean_youtube_parts(url, parts)
+
+def _minimize_amazon_parts(url: str, parts: urllib.parse.SplitResult) -> str:
+    # Keep only the product ID (dp/XXXXXXXXXX) on the same domain
+    dp_match = _AMAZON_DP_RE.search(parts.path)
+    if dp_match and parts.scheme in ('http', 'https'):
+        return f"{parts.scheme}://{parts.netloc}{dp_match.group(0)}/"
+    return clean_url(url)
+
+def clean_youtube_url(url: str) -> str:
+    """Clean YouTube URL by keeping only the video ID parameter"""
+    parts = _split_url(url)
+    return clean_url(url) if parts is None else _clean_youtube_parts(url, parts)
+
 def clean_amazon_url(url: str) -> str:
     """Clean Amazon URL by removing all query parameters"""
     return clean_url(url)
 
 def minimize_youtube_url(url: str) -> str:
     """Convert YouTube URL to its shortest form (youtu.be)"""
-    # First clean the URL
-    cleaned = clean_youtube_url(url)
-    
-    # Extract video ID
-    video_id = None
-    if 'youtu.be/' in cleaned:
-        video_id = cleaned.split('youtu.be/')[1]
-    elif 'v=' in cleaned:
-        video_id = cleaned.split('v=')[1]
-    
-    if video_id:
-        return f"https://youtu.be/{video_id}"
-    return cleaned
+    parts = _split_url(url)
+    return clean_url(url) if parts is None else _minimize_youtube_parts(url, parts)
 
 def minimize_amazon_url(url: str) -> str:
     """Minimize Amazon URL to just the product page"""
-    # First clean the URL
-    cleaned = clean_amazon_url(url)
-    
-    # Extract the product ID (dp/XXXXXXXXXX)
-    dp_match = re.search(r'(/dp/[A-Z0-9]{10})', cleaned)
-    if dp_match:
-        # Get the domain
-        domain_match = re.match(r'(https?://[^/]+)', cleaned)
-        if domain_match:
-            domain = domain_match.group(1)
-            return f"{domain}{dp_match.group(1)}/"
-    
-    return cleaned
-
+    parts = _split_url(url)
+    return clean_url(url) if parts is None else _minimize_amazon_parts(url, parts)
+
+# Site rules: (host suffixes, {mode: handler(url, parts)}); first match wins
+_URL_RULES: Tuple[Tuple[Tuple[str, ...], Dict[str, Callable[[str, urllib.parse.SplitResult], str]]], ...] = (
+    (_YOUTUBE_SUFFIXES, {'cleaned': _clean_youtube_parts,
+                         'minimalistic': _minimize_youtube_parts}),
+    (_AMAZON_SUFFIXES, {'cleaned': lambda url, parts: clean_amazon_url(url),
+                        'minimalistic': _minimize_amazon_parts}),
+)
+
+# Tabs are cycled until the same URLs come round again, so most calls near
+# the end of a run are repeats; memoize them into a single dict lookup.
+@functools.lru_cache(maxsize=4096)
 def process_url(url: str, mode: str) -> str:
     """
     Process URL based on the selected mode
@@ -228,37 +392,64 @@ def process_url(url: str, mode: str) -> str:
     if mode == 'full':
         return url
     
+    # Split once; site detection and cleaning all work on the same parts
+    parts = _split_url(url)
+    host = '.' + _parts_host(parts)
+    
     # Apply site-specific processing
-    if is_youtube_url(url):
-        if mode == 'cleaned':
-            return clean_youtube_url(url)
-        elif mode == 'minimalistic':
-            return minimize_youtube_url(url)
-    elif is_amazon_url(url):
-        if mode == 'cleaned':
-            return clean_amazon_url(url)
-        elif mode == 'minimalistic':
-            return minimize_amazon_url(url)
+    for suffixes, handlers in _URL_RULES:
+        if host.endswith(suffixes):
+            handler = handlers.get(mode)
+            if handler is not None:
+                return handler(url, parts)
+            break
     
     # Default processing for other URLs
-    if mode == 'cleaned':
+    # (for now, minimalistic is same as cleaned for unknown sites)
+    if mode in ('cleaned', 'minimalistic'):
         return clean_url(url)
-    elif mode == 'minimalistic':
-        return clean_url(url)  # For now, minimalistic is same as cleaned for unknown sites
     
     # Fallback
     return url
 
-def send_key(key_command: str, verbose: bool = False) -> None:
-    """Send keyboard commands using xdotool, but first verify browser is focused"""
-    # Check that browser is still focused before sending any keys
-    assert_browser_focused(verbose)
-    
+def send_keys(key_commands: List[str], step_delay: float, verbose: bool = False,
+              focus_max_age: float = 0.0, last_delay: Optional[float] = None) -> None:
+    """Send several key presses with ONE xdotool run, pausing step_delay after each
+
+    xdotool chains commands (`key A sleep S key B sleep S ...`), so a whole
+    batch costs one process instead of one per key.  Browser focus is
+    verified once, before the batch.  last_delay overrides the pause after
+    the final key (0 = return as soon as it is sent).
+    """
+    assert_browser_focused(verbose, focus_max_age)
+
+    xdotool_cmd = ['xdotool']
+    for key_command in key_commands:
+        xdotool_cmd += ['key', key_command, 'sleep', f"{step_delay:g}"]
+    if last_delay is not None:
+        if last_delay > 0:
+            xdotool_cmd[-1] = f"{last_delay:g}"
+        else:
+            del xdotool_cmd[-2:]
     try:
-        subprocess.run(['xdotool', 'key', key_command], check=True)
+        subprocess.run(xdotool_cmd, check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error sending keyboard command: {e}", file=sys.stderr)
 
+def wait_for_clipboard_change(previous: str, timeout: float, poll_interval: float = 0.01) -> str:
+    """Read the clipboard until it differs from previous, for at most timeout seconds
+
+    Returns the last value read; on timeout that is the unchanged content
+    (e.g. two tabs showing the same URL). An empty read (failed read, or the
+    clipboard owner is just changing) does not count as a change.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        content = get_clipboard()
+        if (content and content != previous) or time.monotonic() >= deadline:
+            return content
+        time.sleep(poll_interval)
+
 def calculate_step_delay(sleep_delay: float, item_delay: Optional[float], verbose: bool) -> float:
     """Calculate the appropriate delay per step based on sleep_delay and item_delay"""
     # Number of steps per tab iteration
@@ -283,12 +474,16 @@ def collect_urls(boot_delay: float, sleep_delay: float, item_delay: Optional[flo
                 url_mode: str, duplicates_threshold: int, max_tabs: int, verbose: bool) -> List[str]:
     """Collect URLs from browser tabs"""
     collected_urls: List[str] = []
+    seen_urls: Set[str] = set()  # O(1) duplicate check; the list keeps order
     duplicates_counter = 0
     duplicates_consecutive = 0
     tabs_visited = 0
     
     # Calculate the appropriate delay per step
     effective_sleep_delay = calculate_step_delay(sleep_delay, item_delay, verbose)
+    # Focus is checked before each key batch; allow an answer of up to one
+    # tab iteration to be reused, so that is about one check per tab
+    focus_max_age = effective_sleep_delay * 3
 
     # Wait for browser window to be focused
     log_verbose("Waiting for browser window to be focused...", verbose)
@@ -299,38 +494,39 @@ def collect_urls(boot_delay: float, sleep_delay: float, item_delay: Optional[flo
 
     log_verbose(f"URL processing mode: {url_mode}", verbose)
 
+    # Whatever is on the clipboard now has not come from a tab yet
+    previous_clipboard = get_clipboard()
+
     while duplicates_consecutive < duplicates_threshold and tabs_visited < max_tabs:
-        # Select address bar
-        log_verbose("Pressing Ctrl+L (to select location)", verbose)
-        send_key('ctrl+l', verbose)
-        time.sleep(effective_sleep_delay)  # Wait for address bar to be selected
-
-        # Copy URL
-        log_verbose("Pressing Ctrl+C (to copy to clipboard)", verbose)
-        send_key('ctrl+c', verbose)
-        time.sleep(effective_sleep_delay)  # Wait for clipboard to be updated
-
-        # Get and process URL
-        original_url = get_clipboard()
+        # Select address bar and copy URL, then instead of sleeping a fixed
+        # effective_sleep_delay for the copy, take the clipboard as soon as
+        # it changes from the previous tab's URL (that delay is only the cap)
+        log_verbose("Pressing Ctrl+L, Ctrl+C (to copy location)", verbose)
+        send_keys(['ctrl+l', 'ctrl+c'], effective_sleep_delay, verbose, focus_max_age, last_delay=0)
+        original_url = wait_for_clipboard_change(previous_clipboard, effective_sleep_delay)
+        previous_clipboard = original_url
+
+        # Move to next tab, waiting for the switch before the next Ctrl+L
+        log_verbose("Pressing Ctrl+PgDn (to move to next tab)", verbose)
+        send_keys(['ctrl+Page_Down'], effective_sleep_delay, verbose, focus_max_age)
+
+        # Process URL
         new_url = process_url(original_url, url_mode)
         
         if verbose and original_url != new_url:
             log_verbose(f"Processed URL: {original_url} -> {new_url}", verbose)
         
-        if new_url in collected_urls:
+        if new_url in seen_urls:
             duplicates_counter += 1
             duplicates_consecutive += 1
             log_verbose(f"Duplicate URL found ({duplicates_counter}/{duplicates_threshold})", verbose)
         else:
             duplicates_consecutive = 0
+            seen_urls.add(new_url)
             collected_urls.append(new_url)
             print(new_url)
             duplicates_counter = 0  # Reset counter when new URL is found
 
-        # Move to next tab
-        log_verbose("Moving to next tab", verbose)
-        send_key('ctrl+Page_Down', verbose)
-        time.sleep(effective_sleep_delay)  # Wait for tab switch
         tabs_visited += 1
 
     return collected_urls
@@ -10,6 +10,7 @@ It performs the following functions:
   - Supports a verbosity flag (-v/--verbose) for detailed logging of executed commands.
   - Forwards any additional arguments after the local file and target to the SSH/SCP commands so that custom SSH options can be used.
   - Optionally skips SSH host key checking if -k/--skip-host-key-check is specified.
+  - Multiplexes all ssh/scp calls over one SSH ControlMaster connection, so the handshake and authentication happen once per run.
 
 Usage Example:
     envsync [-v|--verbose] [-k|--skip-host-key-check] local_file user@server:remote_file [ssh_options...]
@@ -30,9 +31,13 @@ License: [Your License]
 """
 
 import sys
+import os
+import shutil
 import subprocess
 import re
+import shlex
 import argparse
+import tempfile
 
 # Global verbosity flag
 VERBOSE = False
@@ -62,43 +67,55 @@ def run_remote_command(user, server, remote_cmd, extra_ssh_args):
     result = subprocess.run(ssh_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
     return result.stdout, result.stderr, result.returncode
 
-def find_best_profile(user, server, extra_ssh_args):
-    """
-    Detect the best profile file on the remote machine.
-    Tries in order: ~/.profile, ~/.xprofile, ~/.bashrc.
-    """
-    profile_files = ["~/.profile", "~/.xprofile", "~/.bashrc"]
-    for profile in profile_files:
-        cmd = f"test -f {profile} && echo exists || echo missing"
-        out, _, _ = run_remote_command(user, server, cmd, extra_ssh_args)
-        if "exists" in out:
-            log_info(f"Found profile file: {profile}")
-            return profile
-    log_info("No profile file found; defaulting to ~/.profile")
-    return "~/.profile"
-
-def add_source_to_profile(user, server, remote_env_file, profile_file, extra_ssh_args):
+# Remote profile candidates, in order of preference
+PROFILE_FILES = ["~/.profile", "~/.xprofile", "~/.bashrc"]
+
+def ensure_source_in_profile(user, server, remote_env_file, extra_ssh_args):
     """
-    Ensure that the 'source <remote_env_file>' line is present in the remote profile file.
-    If not, append it.
+    Detect the best remote profile file (the first of PROFILE_FILES that
+    exists, else ~/.profile) and make sure it sources remote_env_file,
+    all in one remote shell run. A missing line is appended (after a
+    comment for .bashrc).
+    Returns the profile file path as expanded on the remote side.
     """
     source_line = f"source {remote_env_file}"
-    # Check if the line already exists
-    check_cmd = f"grep -Fxq '{source_line}' {profile_file} && echo found || echo missing"
-    out, _, _ = run_remote_command(user, server, check_cmd, extra_ssh_args)
-    if "found" in out:
+    quoted_line = shlex.quote(source_line)
+    remote_script = (
+        f"f=; for p in {' '.join(PROFILE_FILES)}; do if [ -f \"$p\" ]; then f=$p; break; fi; done; "
+        f"f=${{f:-$HOME/.profile}}; "
+        f"if grep -Fxq {quoted_line} \"$f\" 2>/dev/null; then echo \"found $f\"; "
+        f"else case $f in "
+        f"*.bashrc) printf '\\n# Load custom env variables\\n%s\\n' {quoted_line} ;; "
+        f"*) printf '%s\\n' {quoted_line} ;; "
+        f"esac >> \"$f\" && echo \"added $f\"; fi"
+    )
+    out, err, returncode = run_remote_command(user, server, remote_script, extra_ssh_args)
+    status, _, profile_file = out.strip().rpartition("\n")[2].partition(" ")
+    if returncode != 0 or status not in ("found", "added"):
+        print(f"ERROR: Could not update remote profile: {err.strip()}", file=sys.stderr)
+        sys.exit(1)
+    log_info(f"Using profile file: {profile_file}")
+    if status == "found":
         log_info(f"'{source_line}' is already present in {profile_file}")
-        return
-
-    # For .bashrc, append with a preceding comment; for others, simply append.
-    if profile_file.endswith(".bashrc"):
-        append_cmd = f"echo -e '\\n# Load custom env variables\\n{source_line}' >> {profile_file}"
     else:
-        append_cmd = f"echo '{source_line}' >> {profile_file}"
-    
-    log_info(f"Appending source command to {profile_file}: {append_cmd}")
-    run_remote_command(user, server, append_cmd, extra_ssh_args)
-    log_info(f"Added '{source_line}' to {profile_file}")
+        log_info(f"Added '{source_line}' to {profile_file}")
+    return profile_file
+
+def control_master_options(control_path):
+    """
+    SSH options that share one multiplexed connection through control_path.
+    The first ssh/scp call becomes the master; later calls reuse its
+    authenticated channel instead of doing their own handshake.
+    """
+    return ["-o", "ControlMaster=auto", "-o", f"ControlPath={control_path}", "-o", "ControlPersist=60"]
+
+def close_control_master(user, server, extra_ssh_args):
+    """
+    Ask a running ControlMaster (if any) to exit.
+    """
+    ssh_cmd = ["ssh"] + extra_ssh_args + ["-O", "exit", f"{user}@{server}"]
+    log_info("Closing shared connection: " + " ".join(ssh_cmd))
+    subprocess.run(ssh_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 def copy_file(local_file, target, extra_ssh_args):
     """
@@ -141,19 +158,29 @@ def main():
         print(f"ERROR: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # Share one SSH connection between scp and all remote commands
+    control_dir = tempfile.mkdtemp(prefix="envsync-")
+    ssh_options = control_master_options(os.path.join(control_dir, "control")) + args.ssh_options
     try:
-        # Copy the environment file to the remote system
-        copy_file(args.local_file, args.target, args.ssh_options)
-    except subprocess.CalledProcessError:
-        print("ERROR: SCP failed.", file=sys.stderr)
-        sys.exit(1)
-
-    # Determine the best profile file on the remote system
-    profile_file = find_best_profile(user, server, args.ssh_options)
-    log_info(f"Using profile file: {profile_file}")
-
-    # Append the source command to the profile file if it is not already present
-    add_source_to_profile(user, server, remote_file, profile_file, args.ssh_options)
+        try:
+            # Copy the environment file to the remote system
+            copy_file(args.local_file, args.target, ssh_options)
+        except subprocess.CalledProcessError:
+            print("ERROR: SCP failed.", file=sys.stderr)
+            sys.exit(1)
+
+        # scp has authenticated (prompting if it had to) and left the master
+        # running, so later calls never need a prompt; BatchMode makes them
+        # fail fast instead of probing for a TTY. Appended last, so an
+        # explicit BatchMode in the user's options still wins.
+        remote_options = ssh_options + ["-o", "BatchMode=yes"]
+
+        # Determine the best profile file on the remote system and append the
+        # source command to it if it is not already present - one ssh call
+        ensure_source_in_profile(user, server, remote_file, remote_options)
+    finally:
+        close_control_master(user, server, ssh_options + ["-o", "BatchMode=yes"])
+        shutil.rmtree(control_dir, ignore_errors=True)
 
 if __name__ == "__main__":
     main()
@@ -12,9 +12,18 @@ Usage Examples:
     etc_hosts_manage.py enable --hostname test.local
     etc_hosts_manage.py delete --hostname test.local
     etc_hosts_manage.py list
+    printf '%s\\n' '{"op": "add", "ip": "127.0.0.51", "hostname": "a.local"}' \
+                   '{"op": "delete", "hostname": "b.local"}' | etc_hosts_manage.py batch
 
 It supports optional comment, marker, verbosity levels, etc.
 
+For an SSH path (user@host:/etc/hosts) all ssh calls share one multiplexed
+connection (OpenSSH ControlMaster, kept for 60s for follow-up runs) unless
+--no-ssh-multiplex is given or --ssh-extra-args already sets ControlMaster/ControlPath.
+
+The file is written (and the previous one kept as <path>.bak unless --no-backup)
+only when the operation changes something; --dry-run prints a unified diff instead.
+
 By default, only lines that end with the marker are modified. The default marker
 is "# ManagedByHostsTool". If the marker is changed to an empty string, all lines
 are considered when searching for matches.
@@ -24,26 +33,41 @@ The script returns 0 if the operation was successful or a non-zero code otherwis
 
 import sys
 import argparse
+import difflib
+import ipaddress
 import json
 import os
+import shlex
+import shutil
 import subprocess
 import tempfile
+from dataclasses import dataclass, field
+
+try:  # optional, much faster JSON encoder; stdlib json is the fallback
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - depends on environment
+    _orjson = None
 
 DEFAULT_MARKER = "# ManagedByHostsTool"
 DEFAULT_HOSTS_PATH = "/etc/hosts"
 
 VERBOSITY_LEVEL = 0
 
-def log_debug(msg):
+# Prefix for error messages, e.g. the batch line being applied
+ERROR_CONTEXT = ""
+
+# Extra args are %-formatted into msg only when the message is printed, so
+# silenced calls in loops (e.g. per batch operation) cost no string building.
+def log_debug(msg, *args):
     if VERBOSITY_LEVEL >= 4:
-        print(f"DEB: {msg}", file=sys.stderr)
+        print(f"DEB: {msg % args if args else msg}", file=sys.stderr)
 
-def log_info(msg):
+def log_info(msg, *args):
     if VERBOSITY_LEVEL >= 1:
-        print(f"INFO: {msg}", file=sys.stderr)
+        print(f"INFO: {msg % args if args else msg}", file=sys.stderr)
 
 def error_exit(msg, code=1):
-    print(f"ERROR: {msg}", file=sys.stderr)
+    print(f"ERROR: {ERROR_CONTEXT}{msg}", file=sys.stderr)
     sys.exit(code)
 
 def is_ssh_path(path):
@@ -61,40 +85,81 @@ def parse_ssh_path(path):
     user_host, remote_path = path.split(':', 1)
     return user_host, remote_path
 
-def read_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path):
+SSH_CONTROL_PERSIST = "60s"
+
+def ssh_multiplex_args(ssh_extra_args):
     """
-    Use ssh to read the remote file and return a list of lines.
+    SSH options that make all ssh calls (read, backup, write - and further
+    runs within SSH_CONTROL_PERSIST) share one connection: the first call
+    becomes the ControlMaster, the others skip the TCP/crypto/auth handshake.
+    Returns [] if the user already configures multiplexing themselves.
+    The socket lives in ~/.ssh (as OpenSSH requires, a directory other users
+    cannot write to); if that directory is not usable, there is no multiplexing.
     """
-    cmd = [ssh_cmd] + ssh_extra_args + [user_host, 'cat', remote_path]
-    log_debug(f"Reading remote file with command: {' '.join(cmd)}")
+    if any("ControlMaster" in arg or "ControlPath" in arg for arg in ssh_extra_args):
+        return []
+    control_dir = os.path.expanduser("~/.ssh")
     try:
-        out = subprocess.check_output(cmd, encoding='utf-8')
-    except subprocess.CalledProcessError as e:
+        os.makedirs(control_dir, mode=0o700, exist_ok=True)
+    except OSError as e:
+        log_debug("Not multiplexing ssh, cannot use %s: %s", control_dir, e)
+        return []
+    control_path = os.path.join(control_dir, "cm-%C")
+    return ["-o", "ControlMaster=auto",
+            "-o", f"ControlPath={control_path}",
+            "-o", f"ControlPersist={SSH_CONTROL_PERSIST}"]
+
+def read_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path):
+    """
+    Use ssh to read the remote file and return a list of lines.
+    The lines are taken from ssh's stdout as they arrive rather than after
+    buffering the whole file into one string first.
+    ssh gets no stdin (-n), so it cannot swallow input meant for us (batch ops).
+    """
+    cmd = [ssh_cmd, '-n'] + ssh_extra_args + [user_host, 'cat', shlex.quote(remote_path)]
+    log_debug("Reading remote file with command: %s", " ".join(cmd))
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, encoding='utf-8')
+    with proc.stdout:
+        lines = [line.rstrip('\n') for line in proc.stdout]
+    if proc.wait() != 0:
+        e = subprocess.CalledProcessError(proc.returncode, cmd)
         error_exit(f"Cannot read remote file: {e}", 1)
-    lines = out.splitlines()
     return lines
 
-def write_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path, lines_data):
+WRITE_CHUNK_LINES = 2048
+
+def iter_text_chunks(lines_data, chunk_lines=WRITE_CHUNK_LINES):
     """
-    Use ssh to create a backup of the remote file, then write new content via stdin.
+    Yield the file content (every line newline-terminated) in pieces of
+    chunk_lines lines, so writing never builds one string as big as the file.
     """
-    # Create backup on remote
-    cmd_backup = [ssh_cmd] + ssh_extra_args + [
-        user_host,
-        f"cp '{remote_path}' '{remote_path}.bak' 2>/dev/null || true"
-    ]
-    log_debug(f"Backing up remote file with command: {' '.join(cmd_backup)}")
-    try:
-        subprocess.check_call(cmd_backup)
-    except subprocess.CalledProcessError as e:
-        error_exit(f"Failed creating backup on remote: {e}", 1)
+    if not lines_data:
+        yield "\n"  # same as "\n".join([]) + "\n"
+    for start in range(0, len(lines_data), chunk_lines):
+        yield "\n".join(lines_data[start:start + chunk_lines]) + "\n"
 
-    # Write new file content
-    cmd_write = [ssh_cmd] + ssh_extra_args + [user_host, f"cat > '{remote_path}'"]
-    log_debug(f"Writing remote file with command: {' '.join(cmd_write)}")
+def write_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path, lines_data, backup=True):
+    """
+    Use one ssh session to back up the remote file (unless backup is False) and write the new content
+    (sent via stdin). The content goes to a copy of the file first (so mode
+    and owner are kept) that is then moved over it; where the file cannot be
+    replaced (e.g. a bind mount) it is overwritten in place instead.
+    """
+    rp = shlex.quote(remote_path)
+    script = (
+        (f"cp -pf {rp} {rp}.bak 2>/dev/null || true; " if backup else "") +
+        f"if cp -p {rp} {rp}.tmp 2>/dev/null; then "
+        f"cat > {rp}.tmp && {{ mv -f {rp}.tmp {rp} 2>/dev/null || "
+        f"{{ cat {rp}.tmp > {rp} && rm -f {rp}.tmp; }}; }}; "
+        f"else cat > {rp}; fi"
+    )
+    cmd_write = [ssh_cmd] + ssh_extra_args + [user_host, "sh -c " + shlex.quote(script)]
+    log_debug("Backing up and writing remote file with command: %s", " ".join(cmd_write))
     try:
         proc = subprocess.Popen(cmd_write, stdin=subprocess.PIPE, text=True)
-        proc.communicate("\n".join(lines_data) + "\n")
+        proc.stdin.writelines(iter_text_chunks(lines_data))
+        proc.stdin.close()
+        proc.wait()
         if proc.returncode != 0:
             error_exit("Failed to write remote file.", proc.returncode)
     except Exception as e:
@@ -107,30 +172,90 @@ def parse_local_file(hosts_path):
     if not os.path.exists(hosts_path):
         error_exit(f"Hosts file not found: {hosts_path}")
 
-    lines_data = []
+    # one read (newline translation and decoding done in C) and one split,
+    # instead of a decoder step and an rstrip per line
     with open(hosts_path, "r", encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.rstrip('\n')
-            lines_data.append(line)
+        lines_data = f.read().split("\n")
+    if lines_data[-1] == "":
+        lines_data.pop()
     return lines_data
 
-def write_local_file(hosts_path, lines_data):
+def write_temp_copy(target_path, lines_data):
     """
-    Write lines back to local /etc/hosts (or any local file), creating a backup.
+    Write the new content to a temporary file next to target_path, with the
+    target's permissions (and owner, if we may), flushed to disk.
+    Returns the temporary path, or None if the directory is not writable.
+    """
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target_path),
+                                        prefix="." + os.path.basename(target_path) + ".")
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as tmp_fd:
+            st = os.stat(target_path)
+            os.fchmod(tmp_fd.fileno(), st.st_mode & 0o7777)
+            try:
+                os.fchown(tmp_fd.fileno(), st.st_uid, st.st_gid)
+            except PermissionError:
+                pass
+            tmp_fd.writelines(iter_text_chunks(lines_data))
+            tmp_fd.flush()
+            os.fsync(tmp_fd.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+def backup_local_file(target_path, backup_path, hardlink):
+    """
+    Make backup_path hold the current content of target_path: as a hard
+    link (no data copied) when the target is about to be replaced by a new
+    file, otherwise - or if linking fails - as a copy.
+    """
+    # never write through an old backup: it may be a link to target_path
+    try:
+        os.unlink(backup_path)
+    except FileNotFoundError:
+        pass
+    if hardlink:
+        try:
+            os.link(target_path, backup_path)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(target_path, backup_path)
+
+def write_local_file(hosts_path, lines_data, backup=True):
+    """
+    Write lines back to local /etc/hosts (or any local file), creating a backup
+    (unless backup is False).
+    The new content goes to a temporary file that atomically replaces the
+    hosts file, so it is never seen half-written, and the old file simply
+    becomes the backup. If the file cannot be replaced (e.g. /etc/hosts
+    bind-mounted into a container) it is overwritten in place as before.
     """
     backup_path = hosts_path + ".bak"
+    target_path = os.path.realpath(hosts_path)
     try:
-        # create backup
-        with open(backup_path, "w", encoding="utf-8") as backup_fd:
-            original = []
-            if os.path.exists(hosts_path):
-                with open(hosts_path, "r", encoding="utf-8") as orig_fd:
-                    original = orig_fd.read()
-            backup_fd.write(original)
+        tmp_path = write_temp_copy(target_path, lines_data)
+        if tmp_path is not None:
+            try:
+                if backup:
+                    backup_local_file(target_path, backup_path, hardlink=True)
+                os.replace(tmp_path, target_path)
+                return
+            except OSError:
+                os.unlink(tmp_path)
+                # the backup may be a link to the file we now overwrite
+                if backup:
+                    backup_local_file(target_path, backup_path, hardlink=False)
+        elif backup:
+            backup_local_file(target_path, backup_path, hardlink=False)
 
         # overwrite hosts file
-        with open(hosts_path, "w", encoding="utf-8") as fd:
-            fd.write("\n".join(lines_data) + "\n")
+        with open(target_path, "w", encoding="utf-8") as fd:
+            fd.writelines(iter_text_chunks(lines_data))
 
     except Exception as e:
         error_exit(f"Failed to write to {hosts_path}: {e}")
@@ -145,40 +270,78 @@ def parse_hosts(hosts_path, ssh_cmd, ssh_extra_args):
     else:
         return parse_local_file(hosts_path)
 
-def write_hosts(hosts_path, lines_data, ssh_cmd, ssh_extra_args):
+def write_hosts(hosts_path, lines_data, ssh_cmd, ssh_extra_args, backup=True):
     """
     Write the hosts file to either local or remote based on the path format.
     """
     if is_ssh_path(hosts_path):
         user_host, remote_path = parse_ssh_path(hosts_path)
-        write_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path, lines_data)
+        write_remote_file(ssh_cmd, ssh_extra_args, user_host, remote_path, lines_data, backup)
     else:
-        write_local_file(hosts_path, lines_data)
+        write_local_file(hosts_path, lines_data, backup)
+
+def save_hosts(hosts, hosts_path, ssh_cmd, ssh_extra_args, backup=True, dry_run=False, original_lines=None):
+    """
+    Write the hosts file if the operation changed anything. Idempotent
+    operations (e.g. disabling a disabled entry) cause no backup and no write.
+    With dry_run, print a unified diff of the changes instead of writing.
+    """
+    if not hosts.changed:
+        log_info("No changes; %s left untouched.", hosts_path)
+        return
+    if dry_run:
+        sys.stdout.writelines(difflib.unified_diff(
+            [line + "\n" for line in original_lines],
+            [line + "\n" for line in hosts.live_lines()],
+            hosts_path, hosts_path + " (new)"))
+        return
+    write_hosts(hosts_path, hosts.live_lines(), ssh_cmd, ssh_extra_args, backup)
 
 def parse_line_components(line):
     """
     Returns (original_line, ip, hostname, unused, trailing, is_commented_out).
     If line is blank or no IP found, returns placeholders.
     """
-    original_line = line
-    is_commented_out = False
-    line = line.strip()
-    if not line or line.startswith('#'):
-        if line.startswith('#'):
-            is_commented_out = True
-            line = line[1:].strip()
-        else:
-            return (original_line, "", "", "", "", is_commented_out)
+    # split(None, 2) strips and tokenizes in one C call and leaves the
+    # trailing part whole, so only that short tail is re-split and joined
+    parts = line.split(None, 2)
+    if not parts:
+        return (line, "", "", "", "", False)
 
-    parts = line.split()
+    is_commented_out = parts[0][0] == '#'
+    if is_commented_out:
+        if parts[0] == '#':
+            # '# ip host ...'
+            parts = line.split(None, 3)[1:]
+        else:
+            # '#ip host ...'
+            parts[0] = parts[0][1:]
     if len(parts) < 2:
-        return (original_line, "", "", "", "", is_commented_out)
+        return (line, "", "", "", "", is_commented_out)
+
+    trailing = " ".join(parts[2].split()) if len(parts) > 2 else ""
+    return (line, parts[0], parts[1], "", trailing, is_commented_out)
 
-    ip_part = parts[0]
-    hostname_part = parts[1]
-    remainder = parts[2:] if len(parts) > 2 else []
-    joined_remainder = " ".join(remainder)
-    return (original_line, ip_part, hostname_part, "", joined_remainder, is_commented_out)
+def line_hostname(line):
+    """
+    Returns just the hostname of a hosts line (same rules as
+    parse_line_components, '' if none) - the cheap path used for indexing.
+    """
+    parts = line.split(None, 3)
+    if not parts:
+        return ""
+    if parts[0] == "#":
+        # '# ip host ...'
+        return parts[2] if len(parts) > 2 else ""
+    # 'ip host ...' or '#ip host ...'
+    return parts[1] if len(parts) > 1 else ""
+
+def canonical_hostname(hostname):
+    """
+    Hostnames are case-insensitive and may carry the root's trailing dot:
+    'Test.Local.' and 'test.local' name the same host.
+    """
+    return hostname.lower().rstrip(".")
 
 def build_line(ip, hostname, comment, marker, is_commented_out):
     """
@@ -187,137 +350,259 @@ def build_line(ip, hostname, comment, marker, is_commented_out):
     """
     final_line = f"{ip} {hostname}"
     comment = comment.strip()
+    marker = marker.strip()
 
     if comment:
         final_line += f" {comment}"
-    if marker.strip():
-        final_line += f" {marker.strip()}"
+    if marker:
+        final_line += f" {marker}"
 
     if is_commented_out:
         return "# " + final_line
     else:
         return final_line
 
-def find_line_index(lines_data, hostname, marker):
+@dataclass
+class HostsIndex:
+    """
+    The lines of a hosts file plus a hostname -> line indices lookup.
+    A single lookup just scans the lines (stopping at the first hit); from
+    the second one on the lookup table is built in one pass and every
+    further lookup is a dict probe instead of a re-scan of the whole file.
+    Mutate the lines only through append/replace/delete to keep both in sync
+    (and `changed` telling whether there is anything to write at all).
+    Deleted lines stay in place as None until live_lines(), so no index
+    ever shifts and the lookup table never needs rebuilding.
+    """
+    lines: list
+    _by_host: dict = field(default=None, repr=False)
+    _scanned: bool = field(default=False, repr=False)
+    _deleted: int = field(default=0, repr=False)
+    _components: dict = field(default_factory=dict, repr=False)
+    changed: bool = field(default=False, repr=False)
+
+    @property
+    def by_host(self):
+        if self._by_host is None:
+            self._by_host = {}
+            for i, line in enumerate(self.lines):
+                if line is None:
+                    continue
+                host = line_hostname(line)
+                if host:
+                    self._by_host.setdefault(canonical_hostname(host), []).append(i)
+        return self._by_host
+
+    def candidates(self, hostname):
+        """
+        Indices of the lines about hostname (compared canonically), in file order.
+        """
+        hostname = canonical_hostname(hostname)
+        if self._by_host is None and not self._scanned:
+            self._scanned = True
+            # substring test first: a C-level scan that rejects nearly all lines
+            return (i for i, line in enumerate(self.lines)
+                    if line is not None and hostname in line.lower()
+                    and canonical_hostname(line_hostname(line)) == hostname)
+        return self.by_host.get(hostname, ())
+
+    def components(self, idx):
+        """
+        parse_line_components() of line idx, parsed once per line version:
+        the lookup and the following operation on the same line share it.
+        """
+        components = self._components.get(idx)
+        if components is None:
+            components = self._components[idx] = parse_line_components(self.lines[idx])
+        return components
+
+    def append(self, line):
+        self.changed = True
+        self.lines.append(line)
+        host = line_hostname(line)
+        if self._by_host is not None and host:
+            self._by_host.setdefault(canonical_hostname(host), []).append(len(self.lines) - 1)
+
+    def replace(self, idx, line):
+        if self.lines[idx] == line:
+            return
+        self.changed = True
+        old_host = canonical_hostname(line_hostname(self.lines[idx]))
+        self.lines[idx] = line
+        self._components.pop(idx, None)
+        host = canonical_hostname(line_hostname(line))
+        if self._by_host is not None and host != old_host:
+            if old_host:
+                self._by_host[old_host].remove(idx)
+            if host:
+                indices = self._by_host.setdefault(host, [])
+                indices.append(idx)
+                indices.sort()
+
+    def delete(self, idx):
+        line = self.lines[idx]
+        self.lines[idx] = None
+        self._deleted += 1
+        self.changed = True
+        self._components.pop(idx, None)
+        host = line_hostname(line)
+        if self._by_host is not None and host:
+            self._by_host[canonical_hostname(host)].remove(idx)
+        return line
+
+    def live_lines(self):
+        """
+        The current lines without the deleted ones (one filtering pass).
+        """
+        if not self._deleted:
+            return self.lines
+        return [line for line in self.lines if line is not None]
+
+def marker_needle(marker):
+    """
+    A substring every line ending with marker must contain verbatim - the
+    marker's last word, since separators around words get normalized - for a
+    cheap `in` pre-check before parsing. None if no pre-check applies.
+    """
+    words = marker.split()
+    return words[-1] if words else None
+
+def normalize_ip(ip):
+    """
+    Validate an IPv4/IPv6 address and return its canonical text form, so
+    a typo never lands in the hosts file and equal addresses compare equal.
+    IPv4-mapped IPv6 addresses keep the dotted tail (::ffff:1.2.3.4), not
+    the hex form str() gives them on older Pythons (::ffff:102:304).
+    """
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        error_exit(f"Invalid IP address: {ip}", 3)
+    mapped = getattr(address, "ipv4_mapped", None)
+    if mapped is not None:
+        return f"::ffff:{mapped}"
+    return str(address)
+
+def find_line_index(hosts, hostname, marker):
     """
     Finds the index of the line for the given hostname that ends with the marker.
     If marker is empty, then any line with the given hostname is considered.
     Returns index or None if not found.
     """
-    for i, line in enumerate(lines_data):
-        _, ip, host, _, trailing, commented = parse_line_components(line)
-        if host == hostname:
-            if marker == "":
+    for i in hosts.candidates(hostname):
+        if marker == "":
+            return i
+        else:
+            _, ip, host, _, trailing, commented = hosts.components(i)
+            if trailing.endswith(marker):
                 return i
-            else:
-                if trailing.endswith(marker):
-                    return i
     return None
 
-def add_entry(lines_data, ip, hostname, user_comment, marker):
+def add_entry(hosts, ip, hostname, user_comment, marker):
     """
     Adds a new entry. If hostname already exists (with lines ending
     in marker if marker is not empty) then refuse.
     """
-    idx = find_line_index(lines_data, hostname, marker)
+    ip = normalize_ip(ip)
+    idx = find_line_index(hosts, hostname, marker)
     if idx is not None:
         error_exit("Hostname already exists with marker. Use update instead.", 1)
 
     new_line = build_line(ip, hostname, user_comment, marker, False)
-    lines_data.append(new_line)
-    return lines_data
+    hosts.append(new_line)
 
-def update_entry(lines_data, ip, hostname, user_comment, marker):
+def update_entry(hosts, ip, hostname, user_comment, marker):
     """
     Update existing line about same hostname if it exists
     otherwise create new one.
     """
-    idx = find_line_index(lines_data, hostname, marker)
+    ip = normalize_ip(ip)
+    idx = find_line_index(hosts, hostname, marker)
     if idx is None:
         # create new
-        lines_data = add_entry(lines_data, ip, hostname, user_comment, marker)
-        return lines_data
+        add_entry(hosts, ip, hostname, user_comment, marker)
+        return
     # update
-    original_line, old_ip, old_host, _, old_trailing, old_commented = parse_line_components(
-        lines_data[idx]
-    )
-    lines_data[idx] = build_line(ip, hostname, user_comment, marker, old_commented)
-    return lines_data
+    original_line, old_ip, old_host, _, old_trailing, old_commented = hosts.components(idx)
+    hosts.replace(idx, build_line(ip, hostname, user_comment, marker, old_commented))
 
-def disable_entry(lines_data, hostname, marker):
+def disable_entry(hosts, hostname, marker):
     """
     Comment out line about hostname if it exists.
     """
-    idx = find_line_index(lines_data, hostname, marker)
+    idx = find_line_index(hosts, hostname, marker)
     if idx is None:
         error_exit("Cannot disable. No entry found.", 1)
 
-    original_line, ip, host, _, trailing, commented = parse_line_components(
-        lines_data[idx]
-    )
+    original_line, ip, host, _, trailing, commented = hosts.components(idx)
     if commented:
         log_info("Entry is already disabled.")
-        return lines_data
-    lines_data[idx] = build_line(ip, host, "", trailing, True)
-    return lines_data
+        return
+    hosts.replace(idx, build_line(ip, host, "", trailing, True))
 
-def enable_entry(lines_data, hostname, marker):
+def enable_entry(hosts, hostname, marker):
     """
     Un-comment line about hostname if it exists.
     """
-    idx = find_line_index(lines_data, hostname, marker)
+    idx = find_line_index(hosts, hostname, marker)
     if idx is None:
         error_exit("Cannot enable. No entry found.", 1)
 
-    original_line, ip, host, _, trailing, commented = parse_line_components(
-        lines_data[idx]
-    )
+    original_line, ip, host, _, trailing, commented = hosts.components(idx)
     if not commented:
         log_info("Entry is already enabled.")
-        return lines_data
-    lines_data[idx] = build_line(ip, host, "", trailing, False)
-    return lines_data
+        return
+    hosts.replace(idx, build_line(ip, host, "", trailing, False))
 
-def delete_entry(lines_data, hostname, marker):
+def delete_entry(hosts, hostname, marker):
     """
     Delete line about hostname if it exists
     """
-    idx = find_line_index(lines_data, hostname, marker)
+    idx = find_line_index(hosts, hostname, marker)
     if idx is None:
         error_exit("Cannot delete. No entry found.", 1)
-    lines_data.pop(idx)
-    return lines_data
+    hosts.delete(idx)
+
+# 'list -o json' output: 2-space indented UTF-8, which orjson and the stdlib
+# fallback produce byte-identically
+if _orjson is not None:
+    def dumps_indented(obj):
+        return _orjson.dumps(obj, option=_orjson.OPT_INDENT_2).decode("utf-8")
+else:
+    def dumps_indented(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False)
 
-def list_entries(lines_data, marker, output_json=False):
+def list_entries(hosts, marker, output_json=False):
     """
     List lines that are managed by this tool, i.e. lines that
     end with the marker (unless marker is empty).
     """
     managed = []
-    for line in lines_data:
+    disabled_out = ["## Disabled lines:\n"]
+    enabled_out = ["\n## Enabled lines:\n"]
+    needle = marker_needle(marker)
+    # one pass: collect JSON entries, or split the text lines straight away
+    for line in hosts.live_lines():
+        if needle is not None and needle not in line:
+            continue
         original_line, ip, host, _, trailing, commented = parse_line_components(line)
         if host and (marker == "" or trailing.endswith(marker)):
-            entry = {
-                "ip": ip,
-                "hostname": host,
-                "disabled": commented,
-                "comment_or_marker": trailing,
-            }
-            managed.append(entry)
+            if output_json:
+                managed.append({
+                    "ip": ip,
+                    "hostname": host,
+                    "disabled": commented,
+                    "comment_or_marker": trailing,
+                })
+            elif commented:
+                disabled_out.append(f"{ip} {host} {trailing} (disabled)\n")
+            else:
+                enabled_out.append(f"{ip} {host} {trailing} (enabled)\n")
 
     if output_json:
-        print(json.dumps(managed, indent=2))
+        print(dumps_indented(managed))
     else:
-        disabled_entries = [entry for entry in managed if entry["disabled"]]
-        enabled_entries = [entry for entry in managed if not entry["disabled"]]
-
-        print("## Disabled lines:")
-        for entry in disabled_entries:
-            print(f"{entry['ip']} {entry['hostname']} {entry['comment_or_marker']} (disabled)")
-
-        print("\n## Enabled lines:")
-        for entry in enabled_entries:
-            print(f"{entry['ip']} {entry['hostname']} {entry['comment_or_marker']} (enabled)")
+        sys.stdout.write("".join(disabled_out) + "".join(enabled_out))
 
 def parse_full_line(line):
     """
@@ -338,11 +623,79 @@ def parse_full_line(line):
         raise ValueError("Must have both IP and hostname in the provided line")
 
     ip = parts[0]
+    try:
+        ipaddress.ip_address(ip)
+    except ValueError:
+        raise ValueError(f"Invalid IP address in the provided line: {ip}")
     hostname = parts[1]
     comment_parts = parts[2:] if len(parts) > 2 else []
     comment = " ".join(comment_parts)
     return ip, hostname, comment
 
+def entry_fields(ip, hostname, comment, full_line):
+    """
+    Validate the add/update inputs (either full_line, or ip and hostname with
+    an optional comment) and return (ip, hostname, comment).
+    """
+    if full_line and (ip or hostname or comment):
+        error_exit("Cannot combine --full-line with --ip/--hostname/--comment.", 2)
+    if not full_line and (not ip or not hostname):
+        error_exit("Must provide either --full-line OR both --ip and --hostname.", 2)
+
+    if full_line:
+        try:
+            return parse_full_line(full_line)
+        except ValueError as ve:
+            error_exit(str(ve), 3)
+    return ip, hostname, comment
+
+BATCH_OPERATIONS = ("add", "update", "disable", "enable", "delete")
+BATCH_STRING_FIELDS = ("ip", "hostname", "comment", "full_line")
+
+def apply_batch(hosts, op_lines, marker):
+    """
+    Apply NDJSON operations, one JSON object per line, e.g.
+        {"op": "add", "ip": "127.0.0.50", "hostname": "test.local", "comment": "..."}
+        {"op": "update", "full_line": "127.0.0.99 test.local"}
+        {"op": "disable", "hostname": "test.local"}
+    to the in-memory hosts lines. Any failing operation aborts the whole
+    batch before anything is written. Returns the number of operations.
+    """
+    global ERROR_CONTEXT
+    count = 0
+    for line_no, op_line in enumerate(op_lines, 1):
+        if not op_line.strip():
+            continue
+        try:
+            op = json.loads(op_line)
+        except ValueError as e:
+            error_exit(f"batch line {line_no}: invalid JSON: {e}", 2)
+        if not isinstance(op, dict) or op.get("op") not in BATCH_OPERATIONS:
+            error_exit(f"batch line {line_no}: 'op' must be one of {', '.join(BATCH_OPERATIONS)}", 2)
+        not_strings = [key for key in BATCH_STRING_FIELDS if key in op and not isinstance(op[key], str)]
+        if not_strings:
+            error_exit(f"batch line {line_no}: {', '.join(repr(key) for key in not_strings)} must be a string", 2)
+        log_info("batch line %d: %s %s", line_no, op["op"], op.get("hostname") or op.get("full_line", ""))
+
+        command = op["op"]
+        # errors from the entry functions below mention the batch line too
+        ERROR_CONTEXT = f"batch line {line_no}: "
+        try:
+            if command in ("add", "update"):
+                ip, host, comment = entry_fields(op.get("ip"), op.get("hostname"),
+                                                 op.get("comment", ""), op.get("full_line"))
+                entry_func = add_entry if command == "add" else update_entry
+                entry_func(hosts, ip, host, comment, marker)
+            else:
+                if not op.get("hostname"):
+                    error_exit(f"'{command}' needs a 'hostname'", 2)
+                entry_func = {"disable": disable_entry, "enable": enable_entry, "delete": delete_entry}[command]
+                entry_func(hosts, op["hostname"], marker)
+        finally:
+            ERROR_CONTEXT = ""
+        count += 1
+    return count
+
 def main():
     global VERBOSITY_LEVEL
     parser = argparse.ArgumentParser(
@@ -365,6 +718,13 @@ def main():
                              "Environment variable SSH_CMD can also be used.")
     parser.add_argument("--ssh-extra-args", default=None,
                         help="Extra arguments (space separated) to pass to the SSH command.")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Do not write the hosts file; print a unified diff of what would change.")
+    parser.add_argument("--no-backup", action="store_true",
+                        help="Do not keep the previous content as <hosts-path>.bak when writing.")
+    parser.add_argument("--no-ssh-multiplex", action="store_true",
+                        help="Do not share one SSH connection (ControlMaster) between the ssh calls "
+                             "of this and following runs within 60s.")
 
     subparsers = parser.add_subparsers(dest="command", required=True)
 
@@ -401,6 +761,15 @@ def main():
     # list
     parser_list = subparsers.add_parser("list", help="List entries managed by this tool.")
 
+    # batch
+    parser_batch = subparsers.add_parser(
+        "batch", help="Apply many operations read as NDJSON, with one read and one write of the hosts file.")
+    parser_batch.add_argument("--input", default="-",
+                              help="File with one JSON operation per line, e.g. "
+                                   '{"op": "add", "ip": "127.0.0.50", "hostname": "test.local"}; '
+                                   "ops: add/update (ip, hostname, comment or full_line), "
+                                   "disable/enable/delete (hostname). Default '-' reads stdin.")
+
     args = parser.parse_args()
     VERBOSITY_LEVEL = args.verbose
 
@@ -408,67 +777,60 @@ def main():
     ssh_extra_args = []
     if args.ssh_extra_args:
         ssh_extra_args = args.ssh_extra_args.split()
+    if is_ssh_path(args.hosts_path) and not args.no_ssh_multiplex:
+        ssh_extra_args = ssh_multiplex_args(ssh_extra_args) + ssh_extra_args
 
     command = args.command
     marker = args.marker
     hosts_path = args.hosts_path
 
-    # read lines from local or remote
-    lines_data = parse_hosts(hosts_path, args.ssh_cmd, ssh_extra_args)
-
-    if command == "add":
-        if args.full_line and (args.ip or args.hostname or args.comment):
-            error_exit("Cannot combine --full-line with --ip/--hostname/--comment.", 2)
-        if not args.full_line and (not args.ip or not args.hostname):
-            error_exit("Must provide either --full-line OR both --ip and --hostname.", 2)
+    # read lines from local or remote; hostnames get indexed once, on first lookup
+    hosts = HostsIndex(parse_hosts(hosts_path, args.ssh_cmd, ssh_extra_args))
+    original_lines = list(hosts.lines) if args.dry_run else None
 
-        if args.full_line:
-            try:
-                ip, host, comment = parse_full_line(args.full_line)
-                lines_data = add_entry(lines_data, ip, host, comment, marker)
-            except ValueError as ve:
-                error_exit(str(ve), 3)
-        else:
-            lines_data = add_entry(lines_data, args.ip, args.hostname, args.comment, marker)
+    def save():
+        save_hosts(hosts, hosts_path, args.ssh_cmd, ssh_extra_args,
+                   backup=not args.no_backup, dry_run=args.dry_run, original_lines=original_lines)
 
-        write_hosts(hosts_path, lines_data, args.ssh_cmd, ssh_extra_args)
+    if command == "add":
+        ip, host, comment = entry_fields(args.ip, args.hostname, args.comment, args.full_line)
+        add_entry(hosts, ip, host, comment, marker)
+        save()
         sys.exit(0)
 
     elif command == "update":
-        if args.full_line and (args.ip or args.hostname or args.comment):
-            error_exit("Cannot combine --full-line with --ip/--hostname/--comment.", 2)
-        if not args.full_line and (not args.ip or not args.hostname):
-            error_exit("Must provide either --full-line OR both --ip and --hostname.", 2)
-
-        if args.full_line:
-            try:
-                ip, host, comment = parse_full_line(args.full_line)
-                lines_data = update_entry(lines_data, ip, host, comment, marker)
-            except ValueError as ve:
-                error_exit(str(ve), 3)
-        else:
-            lines_data = update_entry(lines_data, args.ip, args.hostname, args.comment, marker)
-
-        write_hosts(hosts_path, lines_data, args.ssh_cmd, ssh_extra_args)
+        ip, host, comment = entry_fields(args.ip, args.hostname, args.comment, args.full_line)
+        update_entry(hosts, ip, host, comment, marker)
+        save()
         sys.exit(0)
 
     elif command == "disable":
-        lines_data = disable_entry(lines_data, args.hostname, marker)
-        write_hosts(hosts_path, lines_data, args.ssh_cmd, ssh_extra_args)
+        disable_entry(hosts, args.hostname, marker)
+        save()
         sys.exit(0)
 
     elif command == "enable":
-        lines_data = enable_entry(lines_data, args.hostname, marker)
-        write_hosts(hosts_path, lines_data, args.ssh_cmd, ssh_extra_args)
+        enable_entry(hosts, args.hostname, marker)
+        save()
         sys.exit(0)
 
     elif command == "delete":
-        lines_data = delete_entry(lines_data, args.hostname, marker)
-        write_hosts(hosts_path, lines_data, args.ssh_cmd, ssh_extra_args)
+        delete_entry(hosts, args.hostname, marker)
+        save()
+        sys.exit(0)
+
+    elif command == "batch":
+        if args.input == "-":
+            count = apply_batch(hosts, sys.stdin, marker)
+        else:
+            with open(args.input, "r", encoding="utf-8") as op_fd:
+                count = apply_batch(hosts, op_fd, marker)
+        log_info("Applied %d operations from the batch.", count)
+        save()
         sys.exit(0)
 
     elif command == "list":
-        list_entries(lines_data, marker, (args.output == "json"))
+        list_entries(hosts, marker, (args.output == "json"))
         sys.exit(0)
 
 if __name__ == "__main__":
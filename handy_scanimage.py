@@ -1,17 +1,152 @@
 #!/usr/bin/env python3
+import hashlib
+import json
 import os
+import random
+import re
+import shlex
 import sys
 import subprocess
 import time
-from datetime import datetime
 import argparse
 
-def scan(basename, file_format, date_option, sane_device, mode, resolution,
-         verbose, icc_profile, output_file, progress, all_options,
-         extra_args, retries=3, delay=1, source='Flatbed'):
+try:  # optional, much faster hash for --skip-duplicates; hashlib is the fallback
+    import xxhash as _xxhash
+except ImportError:  # pragma: no cover - depends on environment
+    _xxhash = None
+
+# Per-process generator: mixing in the pid makes concurrent instances (e.g. several
+# runs against one shared scanner) draw different delays even with a coarse clock.
+_retry_rng = random.Random(time.time_ns() ^ os.getpid())
+
+def jittered_backoff(attempt, base_delay=1, max_delay=60, jitter='full', previous=None):
     """
-    Perform a single scan using scanimage (non-batch mode).
-    Returns the name of the created file or None if scanimage fails.
+    Return the delay in seconds before retry number `attempt` (0-based):
+    exponential backoff capped at max_delay, with
+      'none'         - the capped exponential delay itself,
+      'full'         - a random delay between 0 and the capped exponential delay,
+      'decorrelated' - a random delay between base_delay and 3x the previous one.
+    """
+    if jitter == 'decorrelated':
+        previous = base_delay if previous is None else previous
+        return min(max_delay, _retry_rng.uniform(base_delay, previous * 3))
+    capped = min(max_delay, base_delay * (2 ** attempt))
+    if jitter == 'none':
+        return capped
+    return _retry_rng.uniform(0, capped)
+
+TIMESTAMP_FORMAT = "%Y-%m-%d--%H-%M-%S"
+
+# Collision counters start at a random point in [0, FILENAME_COUNTER_START_RANGE)
+# so that concurrent runs writing to one directory do not all race for the same
+# next name; the per-process generator keeps those start points apart the same
+# way _retry_rng does for retry delays.
+FILENAME_COUNTER_START_RANGE = 1024
+FILENAME_COUNTER_RANGE = 4096
+_filename_rng = random.Random(time.time_ns() ^ os.getpid())
+
+def _existing_names(path_in_dir):
+    """
+    Set of names in the directory of path_in_dir (one directory read instead
+    of a stat per candidate name).
+    """
+    try:
+        with os.scandir(os.path.dirname(path_in_dir) or '.') as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+def _batch_pages(prefix):
+    """
+    Files already produced by a scanimage batch with this '%d' prefix, in page
+    number order. Any --batch-start/--batch-increment works and gaps are fine.
+    """
+    head, _, tail = os.path.basename(prefix).partition('%d')
+    page_re = re.compile(re.escape(head) + r'(\d+)' + re.escape(tail) + r'\Z')
+    pages = []
+    for name in _existing_names(prefix):
+        m = page_re.match(name)
+        if m:
+            pages.append((int(m.group(1)), name))
+    directory = os.path.dirname(prefix)
+    return [os.path.join(directory, name) for _, name in sorted(pages)]
+
+# Batch options added for ADF Duplex unless already given: (option name, argument)
+ADF_DUPLEX_DEFAULTS = (
+    ('--batch-double', '--batch-double'),
+    ('--batch-increment', '--batch-increment=1'),
+)
+
+def _flag_names(cmd_args):
+    """
+    Set of option names in cmd_args, without any '=value' part.
+    """
+    return {arg.split('=', 1)[0] for arg in cmd_args}
+
+def _filename_stem(basename, date_option, timestamp):
+    """
+    Output filename without extension, with the timestamp placed per --date.
+    """
+    if date_option == 'prefix':
+        return f"{timestamp}-{basename}"
+    elif date_option == 'suffix':
+        return f"{basename}-{timestamp}"
+    return f"{basename}"
+
+def _make_filename(basename, file_format, date_option, timestamp, counter=None):
+    """
+    Build the output filename; counter (if given) is appended before the extension.
+    """
+    stem = _filename_stem(basename, date_option, timestamp)
+    if counter is not None:
+        stem = f"{stem}-{counter:04d}"
+    return f"{stem}.{file_format}"
+
+def _reserve_filename(basename, file_format, date_option, timestamp, verbose=False, reserve=True):
+    """
+    Pick a free output filename and reserve it by creating it empty with
+    O_CREAT|O_EXCL, so concurrent runs can never choose the same name
+    (scanimage then overwrites the placeholder). On a collision a counter
+    is appended. With reserve=False nothing is created (the name is only
+    checked). Returns None if no free name is found.
+    """
+    filename = _make_filename(basename, file_format, date_option, timestamp)
+    start = _filename_rng.randrange(FILENAME_COUNTER_START_RANGE)
+    counters = range(start, start + FILENAME_COUNTER_RANGE)
+    for counter in [None, *counters]:
+        if counter is not None:
+            filename = _make_filename(basename, file_format, date_option, timestamp, counter)
+        try:
+            if not reserve:
+                if os.path.lexists(filename):
+                    raise FileExistsError(filename)
+                return filename
+            os.close(os.open(filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            return filename
+        except FileExistsError:
+            if verbose and counter is None:
+                print(f"INFO: File {filename} already exists. Adding a counter to the name.", file=sys.stderr)
+    print(f"ERROR: No free filename found for {basename}.", file=sys.stderr)
+    return None
+
+def _release_filename(filename):
+    """
+    Remove a placeholder left by _reserve_filename() if nothing was scanned into it.
+    """
+    try:
+        if os.path.getsize(filename) == 0:
+            os.unlink(filename)
+    except OSError:
+        pass
+
+def prepare_scan(basename, file_format, date_option, sane_device, mode, resolution,
+                 verbose, icc_profile, output_file, progress, all_options,
+                 extra_args, source='Flatbed', reserve=True):
+    """
+    Build the scanimage command for a single (non-batch) scan.
+    Returns (cmd, filename); filename is None for --all-options (nothing is
+    scanned) and cmd is None if no free filename could be found.
+    A generated filename is reserved on disk (see _reserve_filename()).
     """
     cmd = [
         'scanimage',
@@ -31,61 +166,341 @@ def scan(basename, file_format, date_option, sane_device, mode, resolution,
     if all_options:
         cmd.append('--all-options')
         cmd.extend(extra_args)
-        if verbose:
-            print(f"INFO: Running command: {' '.join(cmd)}", file=sys.stderr)
-        scanimage_result = subprocess.run(cmd)
-        return None
+        return cmd, None
 
     # Figure out the desired filename
     if output_file:
         filename = output_file
     else:
-        timestamp = datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
-        if date_option == 'prefix':
-            filename = f"{timestamp}-{basename}.{file_format}"
-        elif date_option == 'suffix':
-            filename = f"{basename}-{timestamp}.{file_format}"
-        else:
-            filename = f"{basename}.{file_format}"
+        # If the name exists (and we didn't explicitly name it with -o),
+        # a counter is added instead of waiting for the next timestamp
+        filename = _reserve_filename(basename, file_format, date_option,
+                                     time.strftime(TIMESTAMP_FORMAT), verbose, reserve)
+        if filename is None:
+            return None, None
 
     # Add --output-file to the command
     cmd.extend(['--output-file', filename])
 
+    cmd.extend(extra_args)
+    return cmd, filename
+
+def start_scan(cmd, filename, verbose=False):
+    """
+    Start scanimage without waiting for it; returns a handle for scan_wait().
+    Several handles (e.g. for different devices) can be in flight at once.
+    """
     if verbose:
-        print(f"INFO: Running command: {' '.join(cmd)}", file=sys.stderr)
+        print(f"INFO: Running command: {shlex.join(cmd)}", file=sys.stderr)
+    return subprocess.Popen(cmd), filename
 
-    # If the file already exists and we didn't explicitly name it with -o, keep making new names
-    while not output_file and os.path.exists(filename):
-        if verbose:
-            print(f"INFO: File {filename} already exists. Waiting 1 second...", file=sys.stderr)
-        time.sleep(1)
-        timestamp = datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
-        if date_option == 'prefix':
-            filename = f"{timestamp}-{basename}.{file_format}"
-        elif date_option == 'suffix':
-            filename = f"{basename}-{timestamp}.{file_format}"
-        else:
-            filename = f"{basename}.{file_format}"
-        cmd[-1] = filename
+def scan_wait(handle):
+    """
+    Wait for a scan started by start_scan().
+    Returns the name of the created file or None if scanimage fails.
+    """
+    proc, filename = handle
+    returncode = proc.wait()
+    if returncode != 0:
+        print(f"ERROR: scanimage failed with return code {returncode}", file=sys.stderr)
+        return None
+    return filename
 
-    cmd.extend(extra_args)
+def scan(basename, file_format, date_option, sane_device, mode, resolution,
+         verbose, icc_profile, output_file, progress, all_options,
+         extra_args, retries=3, delay=1, source='Flatbed',
+         retry_max_delay=None, retry_jitter='full', dry_run=False, device_check_ttl=None):
+    """
+    Perform a single scan using scanimage (non-batch mode).
+    Returns the name of the created file or None if scanimage fails.
+    With dry_run, only print the scanimage command to stdout and return None.
+    Unless device_check_ttl is None, a failed first attempt is not retried
+    if `scanimage -L` (cached for device_check_ttl seconds) does not list the device.
+    """
+    cmd, filename = prepare_scan(basename, file_format, date_option, sane_device, mode,
+                                 resolution, verbose, icc_profile, output_file, progress,
+                                 all_options, extra_args, source, reserve=not dry_run)
+    if cmd is None:
+        return None
+    if dry_run:
+        sys.stdout.write(shlex.join(cmd) + '\n')
+        return None
+    if filename is None:
+        scan_wait(start_scan(cmd, None, verbose))
+        return None
 
-    # Try scanning, with optional retries if scanimage fails
+    if retry_max_delay is None:
+        retry_max_delay = max(delay * 16, 60)
+
+    # Try scanning, with optional retries (exponential backoff) if scanimage fails
     attempt = 0
+    sleep_for = None
     while attempt <= retries:
-        scanimage_result = subprocess.run(cmd)
-        if scanimage_result.returncode == 0:
+        if scan_wait(start_scan(cmd, filename, verbose and attempt == 0)):
             print(filename)
             return filename
-        else:
-            print(f"ERROR: scanimage failed with return code {scanimage_result.returncode}", file=sys.stderr)
-            if attempt < retries:
-                print(f"INFO: Retrying in {delay} seconds... (Attempt {attempt + 1} of {retries})", file=sys.stderr)
-                time.sleep(delay)
+        if attempt == 0 and retries > 0 and device_check_ttl is not None:
+            hint = unlisted_device_hint(sane_device, device_check_ttl)
+            if hint is not None:
+                print(f"ERROR: {hint}; not retrying (use --no-device-check to retry anyway).",
+                      file=sys.stderr)
+                break
+        if attempt < retries:
+            sleep_for = jittered_backoff(attempt, delay, retry_max_delay, retry_jitter, sleep_for)
+            print(f"INFO: Retrying in {sleep_for:.1f} seconds... (Attempt {attempt + 1} of {retries})", file=sys.stderr)
+            time.sleep(sleep_for)
         attempt += 1
 
+    if not output_file:
+        _release_filename(filename)
+    return None
+
+
+CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                         'handy_scanimage')
+THESAURUS_PATH = os.path.join(CACHE_DIR, 'thesaurus.jsonl')
+THESAURUS_MAX_ENTRIES = 1000
+DEVICE_CACHE_PATH = os.path.join(CACHE_DIR, 'device.json')
+DEVICES_CACHE_PATH = os.path.join(CACHE_DIR, 'devices.json')
+DEVICE_PROBE_TIMEOUT = 5
+
+def _write_cache_text(path, text):
+    """
+    Atomically replace a cache file (failures to do so are not fatal).
+    """
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+def _write_cache_json(path, data):
+    _write_cache_text(path, json.dumps(data))
+
+def known_devices(ttl, refresh=False):
+    """
+    Devices listed by `scanimage -L`, cached for ttl seconds.
+    Returns (devices, from_cache), or (None, False) if scanimage could not list them.
+    """
+    if not refresh:
+        try:
+            with open(DEVICES_CACHE_PATH, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if time.time() - cached['last_seen_ts'] < ttl:
+                return cached['devices'], True
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    try:
+        listing = subprocess.run(['scanimage', '-L'], capture_output=True, text=True,
+                                 timeout=DEVICE_PROBE_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None, False
+    if listing.returncode != 0:
+        return None, False
+    devices = re.findall(r"device `([^']+)'", listing.stdout)
+    _write_cache_json(DEVICES_CACHE_PATH, {'devices': devices, 'last_seen_ts': time.time()})
+    return devices, False
+
+def unlisted_device_hint(sane_device, ttl):
+    """
+    Return a message if `scanimage -L` lists neither sane_device nor, for a
+    backend-only name (e.g. 'pixma'), any device of that backend; None if it
+    does or if devices cannot be listed. A stale cached list is refreshed first.
+    """
+    def listed(devices):
+        return any(d == sane_device or d.startswith(sane_device + ':') for d in devices)
+
+    devices, from_cache = known_devices(ttl)
+    if devices is not None and not listed(devices) and from_cache:
+        devices, from_cache = known_devices(ttl, refresh=True)
+    if devices is None or listed(devices):
+        return None
+    return (f"SANE device {sane_device!r} is not listed by `scanimage -L`, "
+            f"known devices: {', '.join(devices) or 'none'}")
+
+def report_unlisted_device(sane_device, ttl):
+    """
+    After a failed scan, tell if `scanimage -L` does not list the device (ttl None: no check).
+    """
+    if ttl is None:
+        return
+    hint = unlisted_device_hint(sane_device, ttl)
+    if hint is not None:
+        print(f"INFO: {hint}", file=sys.stderr)
+
+def load_cached_device(ttl):
+    """
+    Return the device of the last successful scan if it is at most ttl seconds old, else None.
+    """
+    try:
+        with open(DEVICE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if time.time() - cached['last_seen_ts'] < ttl:
+            return cached['device']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
     return None
 
+def save_cached_device(device):
+    """
+    Remember the device of a successful scan (failures to do so are not fatal).
+    """
+    _write_cache_json(DEVICE_CACHE_PATH, {'device': device, 'last_seen_ts': time.time()})
+
+# (path, mtime_ns) -> hash, so a file is hashed only once unless it changes
+_hash_memo = {}
+
+def file_hash(path):
+    """
+    Hash of the file content, prefixed with the algorithm name.
+    """
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns)
+    if key not in _hash_memo:
+        h = _xxhash.xxh128() if _xxhash else hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        _hash_memo[key] = ('xxh128:' if _xxhash else 'blake2b:') + h.hexdigest()
+    return _hash_memo[key]
+
+def drop_duplicate_scans(filenames, verbose):
+    """
+    Return only the files whose content was not produced before, and
+    remember them in the thesaurus (oldest entries are dropped past
+    THESAURUS_MAX_ENTRIES).
+    """
+    entries = []
+    try:
+        with open(THESAURUS_PATH, 'r', encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        entries = []
+    known = {entry['hash']: entry['filename'] for entry in entries}
+
+    new_files = []
+    for filename in filenames:
+        digest = file_hash(filename)
+        if digest in known:
+            if verbose:
+                print(f"INFO: {filename} is identical to earlier scan {known[digest]}, not viewing it.",
+                      file=sys.stderr)
+            continue
+        known[digest] = filename
+        entries.append({'hash': digest, 'filename': os.path.abspath(filename),
+                        'mtime': os.path.getmtime(filename)})
+        new_files.append(filename)
+
+    if new_files:
+        _write_cache_text(THESAURUS_PATH, ''.join(json.dumps(entry) + '\n'
+                                                  for entry in entries[-THESAURUS_MAX_ENTRIES:]))
+    return new_files
+
+def view_command(view, filename):
+    """
+    Build the viewer argv for a file; {} in view is replaced by the filename,
+    otherwise the filename is appended.
+    """
+    if '{}' in view:
+        return view.format(filename).split()
+    return view.split() + [filename]
+
+def view_files(view, filenames, verbose, parallel=1):
+    """
+    Run the viewer for each file, at most `parallel` viewers at a time.
+    """
+    view_cmd_lists = [view_command(view, filename) for filename in filenames]
+    if verbose:
+        for filename, view_cmd_list in zip(filenames, view_cmd_lists):
+            print(f"INFO: Running viewer command for {filename}: {shlex.join(view_cmd_list)}",
+                  file=sys.stderr)
+    if parallel <= 1 or len(view_cmd_lists) <= 1:
+        for view_cmd_list in view_cmd_lists:
+            subprocess.run(view_cmd_list)
+        return
+    from concurrent.futures import ThreadPoolExecutor  # pulls in logging; only needed here
+    with ThreadPoolExecutor(max_workers=min(parallel, len(view_cmd_lists))) as pool:
+        list(pool.map(subprocess.run, view_cmd_lists))
+
+def run_batch_printing(batch_cmd, on_page):
+    """
+    Run the batch scan with --batch-print and call on_page() with each page
+    name as soon as scanimage reports it written, while the following pages
+    are still being scanned. The names are passed on to stdout only if the
+    user asked for --batch-print.
+    Returns the scanimage return code.
+    """
+    echo_pages = '--batch-print' in _flag_names(batch_cmd)
+    if not echo_pages:
+        batch_cmd = batch_cmd + ['--batch-print']
+    with subprocess.Popen(batch_cmd, stdout=subprocess.PIPE, text=True) as proc:
+        for line in proc.stdout:
+            page = line.rstrip('\n')
+            if echo_pages:
+                print(page, flush=True)
+            if page:
+                on_page(page)
+    return proc.returncode
+
+def batch_scan_streaming(batch_cmd, view, verbose, parallel=1, skip_duplicates=False):
+    """
+    Run the batch scan and open each page in the viewer as soon as it is
+    written (up to `parallel` viewers at a time). Viewers that could not be
+    run (e.g. not installed) are reported once all of them have finished.
+    Returns the scanimage return code.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    viewer_runs = []
+
+    def view_page(page):
+        if skip_duplicates and not drop_duplicate_scans([page], verbose):
+            return
+        view_cmd_list = view_command(view, page)
+        if verbose:
+            print(f"INFO: Running viewer command for {page}: {shlex.join(view_cmd_list)}",
+                  file=sys.stderr)
+        viewer_runs.append((page, pool.submit(subprocess.run, view_cmd_list)))
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as pool:
+        returncode = run_batch_printing(batch_cmd, view_page)
+    for page, viewer_run in viewer_runs:
+        error = viewer_run.exception()
+        if error is not None:
+            print(f"ERROR: Could not run the viewer for {page}: {error}", file=sys.stderr)
+    return returncode
+
+def open_view_stream(view_stream, verbose):
+    """
+    Start a --view-stream viewer, which reads filenames (one per line) from its stdin.
+    """
+    view_cmd_list = shlex.split(view_stream)
+    if verbose:
+        print(f"INFO: Running streaming viewer command: {shlex.join(view_cmd_list)}", file=sys.stderr)
+    return subprocess.Popen(view_cmd_list, stdin=subprocess.PIPE, text=True)
+
+def send_to_view_stream(viewer, filename):
+    """
+    Pass one filename to a --view-stream viewer (ignored once the viewer has exited).
+    """
+    try:
+        viewer.stdin.write(filename + '\n')
+        viewer.stdin.flush()
+    except BrokenPipeError:
+        pass
+
+def close_view_stream(viewer):
+    """
+    Signal end of input to a --view-stream viewer and wait for it to exit.
+    """
+    try:
+        viewer.stdin.close()
+    except BrokenPipeError:
+        pass
+    return viewer.wait()
 
 def main():
     parser = argparse.ArgumentParser(description='Scan an image with options.',
@@ -103,9 +518,19 @@ def main():
                         help='Date position in filename')
     parser.add_argument('-v', '--verbose', action='store_true',
                         help='Enable verbose output')
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help='Print the scanimage command instead of running it')
     parser.add_argument('-d', '--device-name', default=None,
                         help='SANE device to use (use `scanimage -L` to find one), '
-                             'if not provided, env. $SCANIMAGE_DEVICE is used')
+                             'if not provided, env. $SCANIMAGE_DEVICE is used, '
+                             'then the device of the last successful scan')
+    parser.add_argument('--device-cache-ttl', type=float, default=3600,
+                        help='How long (in seconds) cached scanner information is reused: '
+                             'the device of the last successful scan (when no device is given) '
+                             'and the `scanimage -L` list used to check the device')
+    parser.add_argument('--no-device-check', action='store_true',
+                        help='When scanimage fails, do not check the device against `scanimage -L` '
+                             '(a device it does not list is not retried)')
     parser.add_argument('-i', '--icc-profile',
                         help='Include this ICC profile into TIFF file')
     parser.add_argument('-o', '--output-file',
@@ -115,13 +540,32 @@ def main():
                         help='Print progress messages')
     parser.add_argument('-A', '--all-options', action='store_true',
                         help='List all available backend options')
-    parser.add_argument('-V', '--view',
-                        help='Command to view the scanned file(s). '
-                             'Use {} as a placeholder for the filename.')
+    view_group = parser.add_mutually_exclusive_group()
+    view_group.add_argument('-V', '--view',
+                            help='Command to view the scanned file(s). '
+                                 'Use {} as a placeholder for the filename.')
+    view_group.add_argument('--view-stream', metavar='CMD',
+                            help='Start one viewer command and write the names of scanned files '
+                                 'to its stdin, one per line, as they are produced '
+                                 '(e.g. "feh -f -")')
+    parser.add_argument('--view-parallel', type=int, metavar='N',
+                        help='In batch mode, run up to N viewer commands at the same time (default: 1)')
+    parser.add_argument('--view-streaming', action='store_true',
+                        help='In batch mode, open each page in the viewer while the next ones '
+                             'are still being scanned (uses scanimage --batch-print)')
+    parser.add_argument('--skip-duplicates', action='store_true',
+                        help='Do not open the viewer for scans byte-identical to an earlier one '
+                             '(hashes are kept in ~/.cache/handy_scanimage/thesaurus.jsonl)')
     parser.add_argument('--retries', type=int, default=3,
                         help='Number of retries if scanimage fails')
     parser.add_argument('--delay', type=int, default=1,
-                        help='Delay in seconds between retries')
+                        help='Base delay in seconds between retries (doubled on each retry)')
+    parser.add_argument('--retry-max-delay', type=float, default=None,
+                        help='Upper bound in seconds for the delay between retries '
+                             '(default: max(16 * delay, 60))')
+    parser.add_argument('--retry-jitter', choices=['none', 'full', 'decorrelated'], default='full',
+                        help='Randomization of the retry delay, so concurrent scans of a shared '
+                             'device do not retry in lockstep')
     parser.add_argument('-s', '--source', choices=['Flatbed','ADF','ADF Duplex'],
                         default='Flatbed',
                         help='Scan source (Flatbed, ADF, or ADF Duplex)')
@@ -143,14 +587,28 @@ def main():
                         help='Additional parameters for scanimage after a double-dash (--).')
 
     args = parser.parse_args()
+    if args.view is None and (args.view_streaming or args.view_parallel is not None):
+        parser.error('--view-streaming and --view-parallel need -V/--view')
+    if args.view_parallel is None:
+        args.view_parallel = 1
     
     if args.device_name is None:
         args.device_name = os.getenv('SCANIMAGE_DEVICE')
+        if args.device_name is None:
+            args.device_name = load_cached_device(args.device_cache_ttl)
+            if args.device_name is not None and args.verbose:
+                print(f"INFO: Using SANE device of the last successful scan: {args.device_name}",
+                      file=sys.stderr)
         if args.device_name is None:
             print("ERROR: SANE device not provided. Use `scanimage -L` to find one and "
                   "provide via `-d` flag or set env variable $SCANIMAGE_DEVICE.", file=sys.stderr)
             sys.exit(1)
 
+    # The device is only checked against `scanimage -L` once scanimage failed:
+    # SANE accepts names it does not list (backend-only names, manual network
+    # URIs), and a working scan should not wait for the probe.
+    device_check_ttl = None if args.no_device_check else args.device_cache_ttl
+
     # If user selected ADF Duplex or batch-prompt, we want to be in batch mode if not already.
     need_auto_batch = False
     if args.source == 'ADF Duplex':
@@ -160,16 +618,11 @@ def main():
 
     # If we need batch mode but none was specified, build an automatic prefix
     if need_auto_batch and args.batch is None:
-        timestamp = datetime.now().strftime("%Y-%m-%d--%H-%M-%S")
+        timestamp = time.strftime(TIMESTAMP_FORMAT)
         if args.output_file:
             base_no_ext = args.output_file
         else:
-            if args.date == 'prefix':
-                base_no_ext = f"{timestamp}-{args.basename}"
-            elif args.date == 'suffix':
-                base_no_ext = f"{args.basename}-{timestamp}"
-            else:
-                base_no_ext = f"{args.basename}"
+            base_no_ext = _filename_stem(args.basename, args.date, timestamp)
         prefix = f"{base_no_ext}-%d.{args.format}"
         args.batch = prefix
         if args.verbose:
@@ -188,17 +641,12 @@ def main():
             # user typed --batch=something, or we forced it above
             prefix = str(args.batch)
 
-        # Insert '%d' if missing
+        # Insert '%d' before the extension if missing, and add an extension
+        # based on --format if there is none (dots in directories don't count)
+        stem, ext = os.path.splitext(prefix)
         if '%d' not in prefix:
-            if '.' in prefix:
-                dot_index = prefix.rfind('.')
-                prefix = prefix[:dot_index] + '_%d' + prefix[dot_index:]
-            else:
-                prefix += '_%d'
-
-        # If there's no extension, add one based on --format
-        if '.' not in prefix:
-            prefix += '.' + args.format
+            stem += '_%d'
+        prefix = stem + (ext or '.' + args.format)
 
         # Build the batch command
         batch_cmd = [
@@ -217,19 +665,12 @@ def main():
 
         # If the user selected ADF Duplex, add '--batch-double' & '--batch-increment=1' if missing
         if args.source == 'ADF Duplex':
-            has_batch_double = any(arg.startswith('--batch-double') for arg in args.extra_args) \
-                               or any(arg.startswith('--batch-double') for arg in batch_cmd)
-            if not has_batch_double:
-                if args.verbose:
-                    print("INFO: Adding --batch-double for ADF Duplex", file=sys.stderr)
-                batch_cmd.append('--batch-double')
-
-            has_batch_increment = any(arg.startswith('--batch-increment=') for arg in args.extra_args) \
-                                  or any(arg.startswith('--batch-increment=') for arg in batch_cmd)
-            if not has_batch_increment:
-                if args.verbose:
-                    print("INFO: Adding --batch-increment=1 for ADF Duplex", file=sys.stderr)
-                batch_cmd.append('--batch-increment=1')
+            present = _flag_names(args.extra_args) | _flag_names(batch_cmd)
+            for name, default_arg in ADF_DUPLEX_DEFAULTS:
+                if name not in present:
+                    if args.verbose:
+                        print(f"INFO: Adding {default_arg} for ADF Duplex", file=sys.stderr)
+                    batch_cmd.append(default_arg)
 
         # Include icc-profile if provided
         if args.icc_profile:
@@ -245,38 +686,48 @@ def main():
         batch_cmd.extend(args.extra_args)
 
         if args.verbose:
-            print(f"INFO: Running command: {' '.join(batch_cmd)}", file=sys.stderr)
+            print(f"INFO: Running command: {shlex.join(batch_cmd)}", file=sys.stderr)
+
+        if args.dry_run:
+            sys.stdout.write(shlex.join(batch_cmd) + '\n')
+            sys.exit(0)
 
         # Run the batch scanning
+        if args.view_stream or (args.view and args.view_streaming):
+            if args.view_stream:
+                viewer = open_view_stream(args.view_stream, args.verbose)
+
+                def stream_page(page):
+                    if not args.skip_duplicates or drop_duplicate_scans([page], args.verbose):
+                        send_to_view_stream(viewer, page)
+                try:
+                    returncode = run_batch_printing(batch_cmd, stream_page)
+                finally:
+                    close_view_stream(viewer)
+            else:
+                returncode = batch_scan_streaming(batch_cmd, args.view, args.verbose,
+                                                  args.view_parallel, args.skip_duplicates)
+            if returncode != 0:
+                print(f"ERROR: scanimage batch mode failed with return code {returncode}", file=sys.stderr)
+                report_unlisted_device(args.device_name, device_check_ttl)
+            else:
+                save_cached_device(args.device_name)
+            sys.exit(returncode)
+
         ret = subprocess.run(batch_cmd)
         if ret.returncode != 0:
             print(f"ERROR: scanimage batch mode failed with return code {ret.returncode}", file=sys.stderr)
+            report_unlisted_device(args.device_name, device_check_ttl)
             sys.exit(ret.returncode)
         else:
+            save_cached_device(args.device_name)
             # If the user specified a viewer, we try to open all generated files
-            # by substituting %d until no more files exist (only if '%d' is present).
+            # matching the prefix, in page order (only if '%d' is present).
             if args.view and '%d' in prefix:
-                i = 1
-                while True:
-                    try:
-                        candidate = prefix % i
-                    except TypeError:
-                        # If prefix is something that can't handle int substitution
-                        # (rare, but might happen if user used e.g. advanced formatting?)
-                        break
-                    if not os.path.exists(candidate):
-                        break
-                    # Construct and run the view command for that file
-                    if '{}' in args.view:
-                        view_cmd = args.view.format(candidate)
-                        view_cmd_list = view_cmd.split()
-                    else:
-                        view_cmd_list = args.view.split() + [candidate]
-                    if args.verbose:
-                        print(f"INFO: Running viewer command for {candidate}: {' '.join(view_cmd_list)}",
-                              file=sys.stderr)
-                    subprocess.run(view_cmd_list)
-                    i += 1
+                scanned_files = _batch_pages(prefix)
+                if args.skip_duplicates:
+                    scanned_files = drop_duplicate_scans(scanned_files, args.verbose)
+                view_files(args.view, scanned_files, args.verbose, args.view_parallel)
 
             sys.exit(0)
 
@@ -296,19 +747,31 @@ def main():
         extra_args=args.extra_args,
         retries=args.retries,
         delay=args.delay,
-        source=args.source
+        source=args.source,
+        retry_max_delay=args.retry_max_delay,
+        retry_jitter=args.retry_jitter,
+        dry_run=args.dry_run,
+        device_check_ttl=device_check_ttl
     )
     
+    if filename:
+        save_cached_device(args.device_name)
+
     # If we have a viewer command, try to open the single scanned file
+    if filename and (args.view or args.view_stream) and args.skip_duplicates:
+        if not drop_duplicate_scans([filename], args.verbose):
+            filename = None
+
+    if filename and args.view_stream:
+        viewer = open_view_stream(args.view_stream, args.verbose)
+        send_to_view_stream(viewer, filename)
+        close_view_stream(viewer)
+
     if filename and args.view:
-        if '{}' in args.view:
-            view_cmd = args.view.format(filename)
-            view_cmd_list = view_cmd.split()
-        else:
-            view_cmd_list = args.view.split() + [filename]
+        view_cmd_list = view_command(args.view, filename)
         
         if args.verbose:
-            print(f"INFO: Running viewer command: {' '.join(view_cmd_list)}", file=sys.stderr)
+            print(f"INFO: Running viewer command: {shlex.join(view_cmd_list)}", file=sys.stderr)
         
         subprocess.run(view_cmd_list)
 
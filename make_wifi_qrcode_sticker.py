@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import argparse
 import qrcode
 import warnings
 from fpdf import FPDF
@@ -13,7 +14,7 @@ warnings.filterwarnings("ignore", category=DeprecationWarning)
 # Required dependencies:
 # pip install qrcode[pil] fpdf2 svglib
 
-def generate_qr_code(ssid, password):
+def generate_qr_code(ssid, password, save_png=True):
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -23,26 +24,34 @@ def generate_qr_code(ssid, password):
     qr_data = f"WIFI:T:WPA;S:{ssid};P:{password};;"
     qr.add_data(qr_data)
     qr.make(fit=True)
-    img_file = f'wifi_{ssid}_qr_code.png'
     img = qr.make_image(fill='black', back_color='white')
-    img.save(img_file)
+    if save_png:
+        img_file = f'wifi_{ssid}_qr_code.png'
+        img.save(img_file)
+    # the PIL image itself, so the PDF can embed it without re-reading the PNG
+    return img.get_image()
 
-def create_sticker(ssid, password):
+def create_sticker(ssid, password, qr_img=None):
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font('Helvetica', 'B', 16)
     pdf.cell(0, 10, f'WiFi: {ssid}', 0, 1)
     pdf.cell(0, 10, f'Password: {password}', 0, 1)
-    img_file=f'wifi_{ssid}_qr_code.png'
-    pdf.image(img_file, x = 10, y = 30, w = 100, h = 100)
+    if qr_img is None:
+        qr_img = f'wifi_{ssid}_qr_code.png'
+    pdf.image(qr_img, x = 10, y = 30, w = 100, h = 100)
     pdf_file=f'wifi_{ssid}_sticker.pdf'
-    pdf.output(pdf_file, 'F')
+    pdf.output(pdf_file)
 
 def main():
+    parser = argparse.ArgumentParser(description='Make a printable PDF sticker with a WiFi QR code.')
+    parser.add_argument('--no-png', action='store_true',
+                        help='Only write the PDF, not the QR code as a separate PNG file')
+    args = parser.parse_args()
     ssid = input("Enter WiFi SSID: ")
     password = input("Enter WiFi Password: ")
-    generate_qr_code(ssid, password)
-    create_sticker(ssid, password)
+    qr_img = generate_qr_code(ssid, password, save_png=not args.no_png)
+    create_sticker(ssid, password, qr_img)
 
 if __name__ == "__main__":
     main()
@@ -11,9 +11,18 @@ import time
 import sys
 import argparse
 import datetime
-from typing import List, Optional, TextIO
+from typing import Callable, List, Optional, TextIO
 # No enum needed anymore, we'll use strings directly
 
+# Up to this step delay (seconds) all keys of a line are sent by one xdotool
+# process, using xdotool's own sleep between them; the focus is then checked
+# once per line. With longer delays focus is checked before every key, as the
+# window is more likely to change in between.
+BATCH_KEYS_MAX_STEP_DELAY = 0.5
+
+# Keyboard commands that paste the clipboard; --direct-type types the line instead
+PASTE_KEYS = ('ctrl+v', 'ctrl+shift+v', 'shift+Insert')
+
 def parse_arguments() -> argparse.Namespace:
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description='Paste lines to a target window')
@@ -41,6 +50,9 @@ def parse_arguments() -> argparse.Namespace:
                         help='Use browser new tab sequence and bookmark them (ctrl+t,ctrl+v,Return,ctrl+d,Return)')
     parser.add_argument('-d', '--delimiter', type=str, default=',',
                         help='Delimiter for paste commands (default: ,)')
+    parser.add_argument('-T', '--direct-type', action='store_true',
+                        help='Type each line with xdotool instead of pasting it via the clipboard '
+                             f'(replaces the paste keys {", ".join(PASTE_KEYS)}; xclip is not used)')
     return parser.parse_args()
 
 def resolve_paste_commands(args) -> str:
@@ -66,15 +78,23 @@ def log_verbose(message: str, verbose: bool) -> None:
     if verbose:
         print(f"INFO: {message}", file=sys.stderr)
 
-def get_focused_window_class() -> str:
-    """Get the class and ID of the currently focused window"""
+def get_focused_window_id() -> str:
+    """Get the ID of the currently focused window ("" if unknown)"""
     try:
-        # Get window ID of focused window
-        window_id = subprocess.run(
+        return subprocess.run(
             ['xdotool', 'getwindowfocus'],
             capture_output=True, text=True, check=True
         ).stdout.strip()
-        
+    except subprocess.CalledProcessError:
+        return ""
+
+def get_focused_window_class() -> str:
+    """Get the class and ID of the currently focused window"""
+    # Get window ID of focused window
+    window_id = get_focused_window_id()
+    if not window_id:
+        return ""
+    try:
         # Get window class using the window ID
         window_class = subprocess.run(
             ['xprop', '-id', window_id, 'WM_CLASS'],
@@ -102,25 +122,28 @@ def wait_for_focus_change(initial_focus: str, verbose: bool) -> str:
         
         time.sleep(0.5)
 
-def assert_window_focused(expected_focus: str, verbose: bool) -> None:
-    """Assert that the expected window is focused, raise exception if not"""
-    current_focus = get_focused_window_class()
+def window_id_of(focus: str) -> str:
+    """Extract the window ID from a get_focused_window_class() result"""
+    return focus.split("(ID: ", 1)[1].split(")", 1)[0]
+
+def assert_window_focused(expected_id: str, verbose: bool) -> None:
+    """Assert that the window with expected_id is focused, raise exception if not"""
+    # Only the window ID is compared, so the WM_CLASS lookup (xprop) is not needed here
+    current_id = get_focused_window_id()
     if verbose:
-        log_verbose(f"Checking focus: {current_focus}", verbose)
-    
-    # Extract just the window ID for comparison
-    expected_id = expected_focus.split("(ID: ")[1].split(")")[0]
-    current_id = current_focus.split("(ID: ")[1].split(")")[0]
+        log_verbose(f"Checking focus: window ID {current_id}", verbose)
     
     if expected_id != current_id:
         raise WindowFocusLostError("Target window focus lost during operation")
 
-def paste_to_clipboard(content: str):
+def paste_to_clipboard(content: str, while_copying: Optional[Callable[[], None]] = None):
     """
     Copy content to the system clipboard using xclip.
     
     Args:
         content (str): The text content to be copied to clipboard
+        while_copying: Optional callable run while xclip starts up, to overlap
+            independent work (e.g. the focus check) with its latency
     
     Raises:
         subprocess.CalledProcessError: If xclip command fails
@@ -128,11 +151,16 @@ def paste_to_clipboard(content: str):
     """
     try:
         # Run xclip command with -selection clipboard to copy to system clipboard
-        subprocess.run(
-            ['xclip', '-selection', 'clipboard'],
-            input=content.encode('utf-8'),
-            check=True
-        )
+        xclip = subprocess.Popen(['xclip', '-selection', 'clipboard'], stdin=subprocess.PIPE)
+        try:
+            xclip.stdin.write(content.encode('utf-8'))
+            xclip.stdin.close()
+            if while_copying is not None:
+                while_copying()
+        finally:
+            returncode = xclip.wait()
+        if returncode:
+            raise subprocess.CalledProcessError(returncode, xclip.args)
     except FileNotFoundError:
         print("Error: xclip is not installed. Please install it first.", file=sys.stderr)
         print("You can install it using: sudo pacman -S xclip", file=sys.stderr)
@@ -141,16 +169,54 @@ def paste_to_clipboard(content: str):
         print(f"Error: Failed to copy to clipboard. Error code: {e.returncode}", file=sys.stderr)
         raise
 
-def send_key(key_command: str, target_focus: str, verbose: bool = False) -> None:
+def send_key(key_command: str, target_id: str, verbose: bool = False, check_focus: bool = True) -> None:
     """Send keyboard commands using xdotool, but first verify target window is focused"""
     # Check that target window is still focused before sending any keys
-    assert_window_focused(target_focus, verbose)
+    if check_focus:
+        assert_window_focused(target_id, verbose)
     
     try:
         subprocess.run(['xdotool', 'key', key_command], check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error sending keyboard command: {e}", file=sys.stderr)
 
+def type_text(text: str, target_id: str, verbose: bool = False, check_focus: bool = True) -> None:
+    """Type text using xdotool, but first verify target window is focused"""
+    if check_focus:
+        assert_window_focused(target_id, verbose)
+    
+    try:
+        subprocess.run(['xdotool', 'type', '--', text], check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error typing text: {e}", file=sys.stderr)
+
+def send_keys(key_commands: List[str], target_id: str, step_delay: float, verbose: bool = False,
+              type_line: Optional[str] = None, check_focus: bool = True) -> None:
+    """
+    Send all keyboard commands of a line with one xdotool process, waiting step_delay after each.
+    If type_line is given, paste keys type it instead.
+    """
+    # Check that target window is still focused before sending any keys
+    if check_focus:
+        assert_window_focused(target_id, verbose)
+    
+    # xdotool's type takes all remaining arguments as text, so it ends a chain
+    xdotool_calls = [['xdotool']]
+    for key_command in key_commands:
+        if type_line is not None and key_command in PASTE_KEYS:
+            xdotool_calls[-1] += ['type', '--', type_line]
+            xdotool_calls.append(['xdotool'])
+        else:
+            xdotool_calls[-1] += ['key', key_command]
+        if step_delay > 0:
+            xdotool_calls[-1] += ['sleep', f"{step_delay:g}"]
+    try:
+        for xdotool_args in xdotool_calls:
+            if len(xdotool_args) > 1:
+                subprocess.run(xdotool_args, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"Error sending keyboard commands: {e}", file=sys.stderr)
+
 def open_input_file(file_path: str) -> TextIO:
     """Open the input file or use stdin if file_path is '-'"""
     if file_path == '-':
@@ -203,13 +269,15 @@ def calculate_step_delay(sleep_delay: float, item_delay: Optional[float], comman
 
 def paste_lines(input_file: TextIO, boot_delay: float, sleep_delay: float, 
                item_delay: Optional[float], verbose: bool,
-               paste_commands: str = 'ctrl+v,Return', delimiter: str = ',') -> None:
+               paste_commands: str = 'ctrl+v,Return', delimiter: str = ',',
+               direct_type: bool = False) -> None:
     """Paste lines from input to target window"""
     # Get initial focus (terminal)
     initial_focus = get_focused_window_class()
     
     # Wait for user to change focus to target window
     target_focus = wait_for_focus_change(initial_focus, verbose)
+    target_id = window_id_of(target_focus)
     
     log_verbose(f"Waiting {boot_delay} seconds before starting...", verbose)
     time.sleep(boot_delay)
@@ -221,15 +289,9 @@ def paste_lines(input_file: TextIO, boot_delay: float, sleep_delay: float,
     # Calculate the appropriate delay per step
     effective_sleep_delay = calculate_step_delay(sleep_delay, item_delay, commands, verbose)
     
-    # Count total lines first
-    total_lines = 0
-    lines_to_process = []
-    
-    for line in input_file:
-        line = line.rstrip('\n')
-        if line:  # Skip empty lines
-            total_lines += 1
-            lines_to_process.append(line)
+    # Read all lines first (to count them), skipping empty lines
+    lines_to_process = [line for line in input_file.read().split('\n') if line]
+    total_lines = len(lines_to_process)
     
     if verbose:
         log_verbose(f"Found {total_lines} non-empty lines to process", verbose)
@@ -265,15 +327,30 @@ def paste_lines(input_file: TextIO, boot_delay: float, sleep_delay: float,
             print(f"INFO: TOTAL LINE PROCESSING TIME: {total_line_time:.2f} sec.", file=sys.stderr)
             print(f"INFO: USING STEP DELAY: {effective_sleep_delay:.2f} sec.", file=sys.stderr)
         
-        # Copy line to clipboard
-        log_verbose(f"Copying to clipboard: {line}", verbose)
-        paste_to_clipboard(line)
+        # Copy line to clipboard (unless it is typed directly), checking
+        # the focus while xclip runs instead of before the first key
+        if not direct_type:
+            if verbose:
+                log_verbose(f"Copying to clipboard: {line}", verbose)
+            paste_to_clipboard(line, while_copying=lambda: assert_window_focused(target_id, verbose))
         
-        # Execute each keyboard command in sequence
+        # Execute the keyboard commands in sequence
+        if effective_sleep_delay <= BATCH_KEYS_MAX_STEP_DELAY:
+            if verbose:
+                log_verbose(f"Executing commands {commands} with {effective_sleep_delay:.2f} seconds after each", verbose)
+            send_keys(commands, target_id, effective_sleep_delay, verbose,
+                      type_line=line if direct_type else None, check_focus=direct_type)
+            continue
         for i, command in enumerate(commands):
-            log_verbose(f"Executing command {i+1}/{len(commands)}: {command}", verbose)
-            send_key(command, target_focus, verbose)
-            log_verbose(f"Waiting {effective_sleep_delay:.2f} seconds after command", verbose)
+            if verbose:
+                log_verbose(f"Executing command {i+1}/{len(commands)}: {command}", verbose)
+            check_focus = direct_type or i > 0
+            if direct_type and command in PASTE_KEYS:
+                type_text(line, target_id, verbose, check_focus)
+            else:
+                send_key(command, target_id, verbose, check_focus)
+            if verbose:
+                log_verbose(f"Waiting {effective_sleep_delay:.2f} seconds after command", verbose)
             time.sleep(effective_sleep_delay)
     
     if verbose:
@@ -292,7 +369,7 @@ def main() -> None:
     try:
         with open_input_file(args.file) as input_file:
             paste_lines(input_file, args.boot, args.sleep, args.item_delay, 
-                       args.verbose, paste_commands, args.delimiter)
+                       args.verbose, paste_commands, args.delimiter, args.direct_type)
     except KeyboardInterrupt:
         print("\nOperation cancelled by user", file=sys.stderr)
         sys.exit(1)